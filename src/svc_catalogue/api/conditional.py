@@ -0,0 +1,121 @@
+"""HTTP conditional request helpers (ETag, Last-Modified, If-* headers)."""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional, Sequence, Union
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy.engine import Row
+
+from ..models import Service
+from ..read_model import ServiceEntry
+
+# ORM objects, ``crud`` read rows and read-model entries all expose id,
+# updated_at and content_hash.
+ServiceLike = Union[Service, Row, ServiceEntry]
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _version_token(service: ServiceLike) -> str:
+    return (
+        f"{service.id}:{_as_utc(service.updated_at).isoformat()}:{service.content_hash}"
+    )
+
+
+def _variant(fields: Optional[Sequence[str]]) -> str:
+    return "" if fields is None else ":" + ",".join(fields)
+
+
+def service_etag(service: ServiceLike, fields: Optional[Sequence[str]] = None) -> str:
+    """Strong ETag for a single service.
+
+    ``updated_at`` alone may only have second precision (SQLite), so the
+    content hash is folded in to tell apart writes within the same second.
+    A sparse representation (``fields``) gets its own tag.
+    """
+    token = _version_token(service) + _variant(fields)
+    digest = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def list_etag(
+    services: Iterable[ServiceLike],
+    total: Optional[int],
+    next_cursor: Optional[str],
+    fields: Optional[Sequence[str]] = None,
+) -> str:
+    """Strong ETag for a page of services, its total, cursor and fields."""
+    digest = hashlib.sha256()
+    for service in services:
+        digest.update(_version_token(service).encode("utf-8"))
+        digest.update(b"\n")
+    digest.update(f"{total}:{next_cursor}{_variant(fields)}".encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def http_date(value: datetime) -> str:
+    """Format ``value`` for ``Last-Modified``."""
+    return format_datetime(_as_utc(value), usegmt=True)
+
+
+def last_modified(service: ServiceLike) -> str:
+    """``Last-Modified`` header value for a service."""
+    return http_date(service.updated_at)
+
+
+def list_modified_at(services: Iterable[ServiceLike]) -> Optional[datetime]:
+    """Latest ``updated_at`` of a page, or ``None`` for an empty page."""
+    return max((_as_utc(service.updated_at) for service in services), default=None)
+
+
+def _etags(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def is_not_modified(
+    request: Request, etag: str, modified_at: Optional[datetime] = None
+) -> bool:
+    """Evaluate ``If-None-Match`` (preferred) or ``If-Modified-Since``."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.removeprefix("W/") for tag in _etags(if_none_match)]
+        return "*" in candidates or etag in candidates
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and modified_at is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return _as_utc(modified_at).replace(microsecond=0) <= _as_utc(since)
+    return False
+
+
+def not_modified_response(
+    etag: str, last_modified_at: Optional[str] = None
+) -> Response:
+    """Empty ``304 Not Modified`` response carrying the current validators."""
+    headers = {"ETag": etag}
+    if last_modified_at is not None:
+        headers["Last-Modified"] = last_modified_at
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+def require_if_match(request: Request, etag: str) -> None:
+    """Reject the request with 412 when ``If-Match`` does not match ``etag``."""
+    if_match = request.headers.get("if-match")
+    if if_match is None:
+        return
+    candidates = _etags(if_match)
+    if "*" not in candidates and etag not in candidates:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Service was modified",
+        )
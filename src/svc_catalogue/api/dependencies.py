@@ -2,15 +2,19 @@
 
 from __future__ import annotations
 
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from typing import Annotated, Optional
 
-from fastapi import Depends, HTTPException, Security, status
+from fastapi import Depends, HTTPException, Request, Security, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlmodel import Session
 
 from ..config import settings
-from ..db import get_session
+from ..db import AsyncSessionLike, get_async_session, get_read_session, get_session
+
+# Requests carrying this header (any value but "false"/"0") read from the
+# primary, e.g. right after a write that replicas may not have applied yet.
+READ_PRIMARY_HEADER = "X-Read-Primary"
 
 
 def _db_session() -> Generator[Session, None, None]:
@@ -18,7 +22,23 @@ def _db_session() -> Generator[Session, None, None]:
         yield session
 
 
+async def _async_db_session() -> AsyncGenerator[AsyncSessionLike, None]:
+    async with get_async_session() as session:
+        yield session
+
+
+async def _read_db_session(
+    request: Request,
+) -> AsyncGenerator[AsyncSessionLike, None]:
+    flag = request.headers.get(READ_PRIMARY_HEADER)
+    primary = flag is not None and flag.strip().lower() not in ("false", "0")
+    async with get_read_session(primary=primary) as session:
+        yield session
+
+
 DBSession = Annotated[Session, Depends(_db_session)]
+AsyncDBSession = Annotated[AsyncSessionLike, Depends(_async_db_session)]
+ReadDBSession = Annotated[AsyncSessionLike, Depends(_read_db_session)]
 
 
 _bearer_scheme = HTTPBearer(auto_error=False)
@@ -4,8 +4,9 @@ from __future__ import annotations
 
 from fastapi import APIRouter
 from sqlalchemy import text
+from sqlmodel import Session
 
-from .dependencies import DBSession
+from .dependencies import ReadDBSession
 
 router = APIRouter(tags=["ops"])
 
@@ -16,8 +17,12 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+def _ping(session: Session) -> None:
+    session.exec(text("SELECT 1"))
+
+
 @router.get("/ready")
-def readiness(session: DBSession) -> dict[str, str]:
+async def readiness(session: ReadDBSession) -> dict[str, str]:
     """Readiness probe verifying database connectivity."""
-    session.exec(text("SELECT 1"))
+    await session.run_sync(_ping)
     return {"status": "ready"}
@@ -0,0 +1,98 @@
+"""Fast JSON rendering for service reads.
+
+List and item reads select plain rows (see :data:`crud.READ_COLUMNS`) and are
+encoded straight to bytes with orjson, bypassing ``ServiceRead`` validation
+and FastAPI's response-model pass. Values are already normalized on write
+(lower-cased tags, canonical endpoint URLs), so the output matches what the
+``ServiceRead`` path would produce.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional, Sequence
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.engine import Row
+
+from ..crud import READ_COLUMNS
+
+
+class ServiceJSONResponse(ORJSONResponse):
+    """orjson response rendering UTC datetimes with a ``Z`` suffix like pydantic."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+def service_payload(row: Any, fields: Sequence[str] = READ_COLUMNS) -> dict[str, Any]:
+    """Plain dict of ``fields`` for one service row or read-model entry, in
+    ``ServiceRead`` order."""
+    return {column: getattr(row, column) for column in fields}
+
+
+def service_list_payload(
+    rows: Sequence[Any],
+    total: Optional[int],
+    next_cursor: Optional[str],
+    fields: Sequence[str] = READ_COLUMNS,
+) -> dict[str, Any]:
+    """Plain dict shaped like ``ServiceList``."""
+    return {
+        "items": [service_payload(row, fields) for row in rows],
+        "total": total,
+        "next_cursor": next_cursor,
+    }
+
+
+def service_lookup_payload(
+    rows: Sequence[Row],
+    ids: Sequence[Any],
+    names: Sequence[str],
+    fields: Sequence[str] = READ_COLUMNS,
+) -> dict[str, Any]:
+    """Plain dict shaped like ``ServiceLookupResult``; misses keep request order."""
+    found_ids = {row.id for row in rows}
+    found_names = {row.name.lower() for row in rows}
+    return {
+        "items": [service_payload(row, fields) for row in rows],
+        "missing_ids": list(dict.fromkeys(i for i in ids if i not in found_ids)),
+        "missing_names": list(
+            dict.fromkeys(n for n in names if n.lower() not in found_names)
+        ),
+    }
+
+
+def endpoint_lookup_payload(rows: Sequence[Row]) -> dict[str, Any]:
+    """Plain dict shaped like ``EndpointLookupResult``."""
+    return {
+        "items": [
+            {"endpoint": row.endpoint, "service": service_payload(row)} for row in rows
+        ]
+    }
+
+
+def service_change_payload(rows: Sequence[Row], since: int) -> dict[str, Any]:
+    """Plain dict shaped like ``ServiceChangeList``.
+
+    ``service`` is the current state of the service, or ``None`` for
+    tombstones and services deleted since the entry was written.
+    """
+    return {
+        "changes": [
+            {
+                "seq": row.seq,
+                "op": row.op,
+                "id": row.service_id,
+                "name": row.service_name,
+                "changed_at": row.changed_at,
+                "service": (
+                    service_payload(row)
+                    if row.id is not None and row.op != "deleted"
+                    else None
+                ),
+            }
+            for row in rows
+        ],
+        "next_cursor": rows[-1].seq if rows else since,
+    }
@@ -2,7 +2,11 @@
 
 from __future__ import annotations
 
-from typing import Annotated, Optional
+import asyncio
+import base64
+import json
+import time
+from typing import Annotated, List, Optional, Union
 from uuid import UUID
 
 from fastapi import (
@@ -11,140 +15,538 @@ from fastapi import (
     File,
     HTTPException,
     Query,
+    Request,
     Response,
     UploadFile,
     status,
 )
+from fastapi.responses import StreamingResponse
 
+from ...batch import apply_service_batch
+from ...changes import change_notifier
+from ...config import settings
 from ...crud import (
+    READ_COLUMNS,
     ServiceAlreadyExistsError,
+    ServiceFilter,
     ServiceNotFoundError,
+)
+from ...crud_async import (
     create_service,
     delete_service,
+    facet_counts,
+    find_services_by_endpoint,
     get_service,
+    get_service_row,
+    list_changes,
+    list_service_endpoints,
     list_services,
+    lookup_services,
     update_service,
 )
-from ...csv_import import CSVImportException, import_services_from_csv, load_csv_content
+from ...csv_import import (
+    CSVImportException,
+    import_services_from_csv,
+    load_csv_content,
+    open_csv_stream,
+)
+from ...export import stream_export
+from ...jobs import ImportJobNotFoundError, ImportJobQueueFullError, import_jobs
+from ...models import Service
+from ...read_model import catalogue
 from ...schemas import (
+    CountMode,
     CSVImportResult,
+    EndpointLookupResult,
+    EndpointStatus,
+    ExportFormat,
+    FacetCount,
+    ImportJobRead,
+    ServiceBatch,
+    ServiceBatchResult,
+    ServiceChangeList,
+    ServiceLookup,
+    ServiceLookupResult,
+    ServiceLookupResultPartial,
     ServiceCreate,
+    ServiceFacets,
     ServiceList,
+    ServiceListPartial,
     ServiceRead,
+    ServiceReadPartial,
     ServiceUpdate,
 )
-from ..dependencies import DBSession, require_token
+from ..conditional import (
+    http_date,
+    is_not_modified,
+    last_modified,
+    list_etag,
+    list_modified_at,
+    not_modified_response,
+    require_if_match,
+    service_etag,
+)
+from ..dependencies import AsyncDBSession, DBSession, ReadDBSession, require_token
+from ..responses import (
+    ServiceJSONResponse,
+    endpoint_lookup_payload,
+    service_change_payload,
+    service_list_payload,
+    service_lookup_payload,
+    service_payload,
+)
 
 router = APIRouter(prefix="/services", tags=["services"])
 
 TokenDep = Annotated[None, Depends(require_token)]
 
 
+def _set_validators(response: Response, service: Service) -> None:
+    response.headers["ETag"] = service_etag(service)
+    response.headers["Last-Modified"] = last_modified(service)
+
+
+FieldsQuery = Query(
+    default=None,
+    description="Comma-separated subset of service fields to return "
+    f"({', '.join(READ_COLUMNS)}); `id` and `name` are always included and "
+    "unselected columns are not read",
+)
+
+
+def _parse_fields(fields: Optional[List[str]]) -> Optional[tuple[str, ...]]:
+    if not fields:
+        return None
+    requested = {name.strip() for value in fields for name in value.split(",")}
+    requested.discard("")
+    unknown = sorted(requested.difference(READ_COLUMNS))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}",
+        )
+    if not requested:
+        return None
+    # Sparse representations stay identifiable (see ``ServiceReadPartial``).
+    requested.update(("id", "name"))
+    return tuple(column for column in READ_COLUMNS if column in requested)
+
+
+def _encode_cursor(name: str, service_id: UUID) -> str:
+    raw = json.dumps([name, str(service_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, UUID]:
+    try:
+        name, service_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(name), UUID(service_id)
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from exc
+
+
 @router.post("", response_model=ServiceRead, status_code=status.HTTP_201_CREATED)
-def create_service_endpoint(
+async def create_service_endpoint(
     service_in: ServiceCreate,
     _: TokenDep,
-    session: DBSession,
+    session: AsyncDBSession,
+    response: Response,
 ) -> ServiceRead:
     try:
-        service = create_service(session, service_in)
+        service = await create_service(session, service_in)
     except ServiceAlreadyExistsError as exc:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT, detail=str(exc)
         ) from exc
+    _set_validators(response, service)
     return ServiceRead.model_validate(service, from_attributes=True)
 
 
 @router.post(
-    "/import", response_model=CSVImportResult, status_code=status.HTTP_202_ACCEPTED
+    ":batch",
+    response_model=ServiceBatchResult,
+    responses={
+        status.HTTP_409_CONFLICT: {
+            "model": ServiceBatchResult,
+            "description": "Atomic batch aborted; nothing was written",
+        }
+    },
+)
+async def batch_services_endpoint(
+    batch: ServiceBatch,
+    _: TokenDep,
+    session: AsyncDBSession,
+    response: Response,
+) -> ServiceBatchResult:
+    if len(batch.operations) > settings.batch_max_operations:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"Batch exceeds {settings.batch_max_operations} operations",
+        )
+    result = await session.run_sync(apply_service_batch, batch)
+    if not result.committed:
+        response.status_code = status.HTTP_409_CONFLICT
+    return result
+
+
+@router.post(
+    ":lookup", response_model=Union[ServiceLookupResult, ServiceLookupResultPartial]
+)
+async def lookup_services_endpoint(
+    lookup: ServiceLookup,
+    _: TokenDep,
+    session: AsyncDBSession,
+    fields: Optional[List[str]] = FieldsQuery,
+) -> Response:
+    if len(lookup.ids) + len(lookup.names) > settings.lookup_max_keys:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"Lookup exceeds {settings.lookup_max_keys} ids and names",
+        )
+    selected = _parse_fields(fields)
+    rows = await lookup_services(session, lookup.ids, lookup.names, fields=selected)
+    return ServiceJSONResponse(
+        service_lookup_payload(rows, lookup.ids, lookup.names, selected or READ_COLUMNS)
+    )
+
+
+@router.post(
+    "/import",
+    response_model=Union[CSVImportResult, ImportJobRead],
+    response_model_exclude_none=True,
+    status_code=status.HTTP_202_ACCEPTED,
 )
 def import_services(
     _: TokenDep,
     session: DBSession,
     file: UploadFile = File(..., description="CSV file with service data"),
-) -> CSVImportResult:
+    stream: bool = Query(
+        default=False,
+        description="Decode the upload incrementally and commit every chunk",
+    ),
+    background: bool = Query(
+        default=False,
+        description="Queue the upload as an import job and return its id",
+    ),
+    dry_run: bool = Query(
+        default=False,
+        description="Return the created/updated/unchanged diff without writing",
+    ),
+) -> Union[CSVImportResult, ImportJobRead]:
     try:
-        buffer = load_csv_content(file)
-        result = import_services_from_csv(session, buffer)
+        if background and dry_run:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="dry_run cannot be combined with background",
+            )
+        if background:
+            return import_jobs.submit(file)
+        if stream:
+            result = import_services_from_csv(
+                session, open_csv_stream(file), commit_chunks=True, dry_run=dry_run
+            )
+        else:
+            buffer = load_csv_content(file)
+            result = import_services_from_csv(session, buffer, dry_run=dry_run)
     except CSVImportException as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
         ) from exc
+    except ImportJobQueueFullError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)
+        ) from exc
     finally:
         file.file.close()
     return result
 
 
-@router.get("", response_model=ServiceList)
-def list_services_endpoint(
+@router.get("/import/{job_id}", response_model=ImportJobRead)
+def get_import_job(job_id: UUID, _: TokenDep) -> ImportJobRead:
+    try:
+        return import_jobs.get(job_id)
+    except ImportJobNotFoundError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)
+        ) from exc
+
+
+_EXPORT_MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv; charset=utf-8",
+}
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {media: {} for media in _EXPORT_MEDIA_TYPES.values()}}},
+)
+def export_services(
     _: TokenDep,
-    session: DBSession,
+    export_format: ExportFormat = Query(
+        default=ExportFormat.ndjson,
+        alias="format",
+        description="`ndjson` (one service per line) or `csv` (import format)",
+    ),
+) -> StreamingResponse:
+    return StreamingResponse(
+        stream_export(export_format.value),
+        media_type=_EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="services.{export_format.value}"'
+            )
+        },
+    )
+
+
+@router.get("/changes", response_model=ServiceChangeList)
+async def list_changes_endpoint(
+    _: TokenDep,
+    session: AsyncDBSession,
+    since: int = Query(
+        default=0, ge=0, description="`next_cursor` of the previous response"
+    ),
+    limit: int = Query(default=100, ge=1, le=1000),
+    wait: float = Query(
+        default=0,
+        ge=0,
+        description="Seconds to wait for a change when none is pending (long-poll)",
+    ),
+) -> Response:
+    deadline = time.monotonic() + min(wait, settings.change_feed_max_wait_seconds)
+    while True:
+        with change_notifier.subscribe() as changed:
+            rows = await list_changes(session, since, limit)
+            # End the read transaction so no pooled connection is held while waiting.
+            await session.commit()
+            remaining = deadline - time.monotonic()
+            if rows or remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(
+                    changed.wait(), min(remaining, settings.change_feed_poll_seconds)
+                )
+            except asyncio.TimeoutError:
+                pass
+    return ServiceJSONResponse(service_change_payload(rows, since))
+
+
+@router.get("/facets", response_model=ServiceFacets)
+async def service_facets_endpoint(
+    _: TokenDep,
+    session: ReadDBSession,
     owner_team: Optional[str] = Query(default=None),
     tier: Optional[str] = Query(default=None),
     lifecycle: Optional[str] = Query(default=None),
+    tag: Optional[str] = Query(default=None, description="Exact tag match"),
+    all_tags: Optional[List[str]] = Query(default=None),
+    any_tags: Optional[List[str]] = Query(default=None),
     search: Optional[str] = Query(default=None),
+    top_tags: int = Query(
+        default=10, ge=0, le=100, description="Most used tags to count"
+    ),
+) -> ServiceFacets:
+    filters = ServiceFilter.build(
+        owner_team=owner_team,
+        tier=tier,
+        lifecycle=lifecycle,
+        search=search,
+        all_tags=[*(all_tags or []), *([tag] if tag else [])],
+        any_tags=any_tags or [],
+    )
+    facets = await facet_counts(session, filters, top_tags=top_tags)
+    return ServiceFacets(
+        **{
+            facet: [FacetCount(value=value, count=n) for value, n in counts]
+            for facet, counts in facets.items()
+        }
+    )
+
+
+@router.get("/by-endpoint", response_model=EndpointLookupResult)
+async def find_by_endpoint_endpoint(
+    _: TokenDep,
+    session: ReadDBSession,
+    url: Optional[str] = Query(
+        default=None,
+        description="Endpoint URL; matches the longest registered path prefix "
+        "on the same host and port",
+    ),
+    host: Optional[str] = Query(
+        default=None, description="Hostname; matches endpoints on any port"
+    ),
+) -> Response:
+    if (url is None) == (host is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Pass exactly one of url or host",
+        )
+    try:
+        rows = await find_services_by_endpoint(session, url=url, host=host)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
+    return ServiceJSONResponse(endpoint_lookup_payload(rows))
+
+
+@router.get("", response_model=Union[ServiceList, ServiceListPartial])
+async def list_services_endpoint(
+    _: TokenDep,
+    session: ReadDBSession,
+    request: Request,
+    owner_team: Optional[str] = Query(default=None),
+    tier: Optional[str] = Query(default=None),
+    lifecycle: Optional[str] = Query(default=None),
+    tag: Optional[str] = Query(default=None, description="Exact tag match"),
+    all_tags: Optional[List[str]] = Query(
+        default=None, description="Services carrying every listed tag"
+    ),
+    any_tags: Optional[List[str]] = Query(
+        default=None, description="Services carrying at least one listed tag"
+    ),
+    search: Optional[str] = Query(
+        default=None,
+        description="Free-text, typo-tolerant search over name and tags; "
+        "results are ranked by relevance and paginated with `offset`",
+    ),
+    cursor: Optional[str] = Query(
+        default=None, description="Opaque `next_cursor` from the previous page"
+    ),
     limit: int = Query(default=50, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
-) -> ServiceList:
-    services, total = list_services(
-        session,
+    count: CountMode = Query(
+        default=CountMode.exact,
+        description="How `total` is computed: exact (cached), planner estimate, or none",
+    ),
+    fields: Optional[List[str]] = FieldsQuery,
+) -> Union[ServiceList, Response]:
+    selected = _parse_fields(fields)
+    if cursor and search:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="cursor cannot be combined with search",
+        )
+    query = dict(
         owner_team=owner_team,
         tier=tier,
         lifecycle=lifecycle,
         search=search,
+        all_tags=[*(all_tags or []), *([tag] if tag else [])],
+        any_tags=any_tags or [],
+        after=_decode_cursor(cursor) if cursor else None,
         limit=limit,
         offset=offset,
+        count=count,
+    )
+    if settings.read_model_enabled:
+        if catalogue.needs_refresh():
+            await session.run_sync(catalogue.refresh)
+        services, total = catalogue.list_services(**query)
+    else:
+        services, total = await list_services(session, **query, fields=selected)
+    next_cursor = None
+    if len(services) == limit and not search:
+        next_cursor = _encode_cursor(services[-1].name, services[-1].id)
+    etag = list_etag(services, total, next_cursor, selected)
+    modified_at = list_modified_at(services)
+    headers = {"ETag": etag}
+    if modified_at is not None:
+        headers["Last-Modified"] = http_date(modified_at)
+    if is_not_modified(request, etag, modified_at):
+        return not_modified_response(etag, headers.get("Last-Modified"))
+    return ServiceJSONResponse(
+        service_list_payload(services, total, next_cursor, selected or READ_COLUMNS),
+        headers=headers,
     )
-    items = [
-        ServiceRead.model_validate(service, from_attributes=True)
-        for service in services
-    ]
-    return ServiceList(items=items, total=total)
 
 
-@router.get("/{service_id}", response_model=ServiceRead)
-def get_service_endpoint(
+@router.get("/{service_id}", response_model=Union[ServiceRead, ServiceReadPartial])
+async def get_service_endpoint(
     service_id: UUID,
     _: TokenDep,
-    session: DBSession,
-) -> ServiceRead:
+    session: ReadDBSession,
+    request: Request,
+    fields: Optional[List[str]] = FieldsQuery,
+) -> Union[ServiceRead, Response]:
+    selected = _parse_fields(fields)
     try:
-        service = get_service(session, service_id)
+        if settings.read_model_enabled:
+            if catalogue.needs_refresh():
+                await session.run_sync(catalogue.refresh)
+            row = catalogue.get(service_id)
+        else:
+            row = await get_service_row(session, service_id, fields=selected)
     except ServiceNotFoundError as exc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)
         ) from exc
-    return ServiceRead.model_validate(service, from_attributes=True)
+    etag = service_etag(row, selected)
+    if is_not_modified(request, etag, row.updated_at):
+        return not_modified_response(etag, last_modified(row))
+    return ServiceJSONResponse(
+        service_payload(row, selected or READ_COLUMNS),
+        headers={"ETag": etag, "Last-Modified": last_modified(row)},
+    )
+
+
+@router.get("/{service_id}/endpoints", response_model=List[EndpointStatus])
+async def list_service_endpoints_endpoint(
+    service_id: UUID,
+    _: TokenDep,
+    session: ReadDBSession,
+) -> List[EndpointStatus]:
+    rows = await list_service_endpoints(session, service_id)
+    if not rows:
+        try:
+            await get_service_row(session, service_id, fields=["id"])
+        except ServiceNotFoundError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)
+            ) from exc
+    return [EndpointStatus.model_validate(row) for row in rows]
 
 
 @router.put("/{service_id}", response_model=ServiceRead)
-def update_service_endpoint(
+async def update_service_endpoint(
     service_id: UUID,
     service_in: ServiceUpdate,
     _: TokenDep,
-    session: DBSession,
+    session: AsyncDBSession,
+    request: Request,
+    response: Response,
 ) -> ServiceRead:
+    conditional = "if-match" in request.headers
     try:
-        service = get_service(session, service_id)
+        service = await get_service(session, service_id, for_update=conditional)
     except ServiceNotFoundError as exc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)
         ) from exc
-    service = update_service(session, service, service_in)
+    require_if_match(request, service_etag(service))
+    service = await update_service(session, service, service_in)
+    _set_validators(response, service)
     return ServiceRead.model_validate(service, from_attributes=True)
 
 
 @router.delete("/{service_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_service_endpoint(
+async def delete_service_endpoint(
     service_id: UUID,
     _: TokenDep,
-    session: DBSession,
+    session: AsyncDBSession,
+    request: Request,
 ) -> Response:
+    conditional = "if-match" in request.headers
     try:
-        service = get_service(session, service_id)
+        service = await get_service(session, service_id, for_update=conditional)
     except ServiceNotFoundError as exc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)
         ) from exc
-    delete_service(session, service)
+    require_if_match(request, service_etag(service))
+    await delete_service(session, service)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,29 @@
+"""Tag endpoints."""
+
+from __future__ import annotations
+
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from ...crud_async import list_tags
+from ...schemas import TagList, TagRead
+from ..dependencies import ReadDBSession, require_token
+
+router = APIRouter(prefix="/tags", tags=["tags"])
+
+TokenDep = Annotated[None, Depends(require_token)]
+
+
+@router.get("", response_model=TagList)
+async def list_tags_endpoint(
+    _: TokenDep,
+    session: ReadDBSession,
+    prefix: Optional[str] = Query(
+        default=None, max_length=50, description="Case-insensitive tag prefix"
+    ),
+    limit: int = Query(default=20, ge=1, le=100),
+) -> TagList:
+    """Tags starting with ``prefix``, most used first, with service counts."""
+    rows = await list_tags(session, prefix, limit)
+    return TagList(items=[TagRead(tag=row.tag, count=row.count) for row in rows])
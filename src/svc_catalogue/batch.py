@@ -0,0 +1,224 @@
+"""Batched create/update/delete of services in one transaction."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from .crud import (
+    CONTENT_COLUMNS,
+    bulk_delete_services,
+    bulk_insert_services,
+    bulk_update_services,
+    content_hash,
+    get_existing_by_names,
+    get_services_by_ids,
+    service_values,
+)
+from .schemas import (
+    BatchCreate,
+    BatchDelete,
+    BatchMode,
+    BatchOperationResult,
+    BatchUpdate,
+    ServiceBatch,
+    ServiceBatchResult,
+)
+from .search import search_document
+
+
+@dataclass
+class _Plan:
+    """Writes planned for the operations that passed their checks."""
+
+    inserts: dict[int, dict[str, Any]] = field(default_factory=dict)
+    updates: dict[int, dict[str, Any]] = field(default_factory=dict)
+    deletes: dict[int, UUID] = field(default_factory=dict)
+
+    def apply(self, session: Session) -> None:
+        bulk_insert_services(session, list(self.inserts.values()))
+        bulk_update_services(session, list(self.updates.values()))
+        bulk_delete_services(session, list(self.deletes.values()))
+
+    def only(self, index: int) -> _Plan:
+        return _Plan(
+            {i: v for i, v in self.inserts.items() if i == index},
+            {i: v for i, v in self.updates.items() if i == index},
+            {i: v for i, v in self.deletes.items() if i == index},
+        )
+
+
+def _result(
+    index: int,
+    op: str,
+    status: int,
+    service_id: Optional[UUID] = None,
+    error: Optional[str] = None,
+) -> BatchOperationResult:
+    return BatchOperationResult(
+        index=index, op=op, status=status, id=service_id, error=error
+    )
+
+
+def _plan(
+    session: Session, batch: ServiceBatch, results: dict[int, BatchOperationResult]
+) -> _Plan:
+    """Check every operation against the database with one query per kind.
+
+    Failed checks are recorded in ``results``; a service may appear in only one
+    operation per batch so the bulk statements do not depend on their order.
+    """
+    creates = {
+        index: service_values(op.service)
+        for index, op in enumerate(batch.operations)
+        if isinstance(op, BatchCreate)
+    }
+    targeted = [
+        op.id for op in batch.operations if isinstance(op, (BatchUpdate, BatchDelete))
+    ]
+    existing_names = get_existing_by_names(
+        session, [values["name"] for values in creates.values()]
+    )
+    existing_ids = get_services_by_ids(
+        session, [*targeted, *(values["id"] for values in creates.values())]
+    )
+
+    plan = _Plan()
+    claimed_ids: set[UUID] = set()
+    claimed_names: set[str] = set()
+    for index, op in enumerate(batch.operations):
+        if isinstance(op, BatchCreate):
+            values = creates[index]
+            name = values["name"].lower()
+            if name in existing_names or name in claimed_names:
+                results[index] = _result(
+                    index, op.op, 409, error="Service with this name already exists"
+                )
+            elif values["id"] in existing_ids or values["id"] in claimed_ids:
+                results[index] = _result(
+                    index, op.op, 409, error="Service with this id already exists"
+                )
+            else:
+                plan.inserts[index] = values
+            claimed_names.add(name)
+            claimed_ids.add(values["id"])
+            continue
+
+        if op.id in claimed_ids:
+            results[index] = _result(
+                index,
+                op.op,
+                409,
+                op.id,
+                "Service appears in more than one operation",
+            )
+            continue
+        claimed_ids.add(op.id)
+        current = existing_ids.get(op.id)
+        if current is None:
+            results[index] = _result(index, op.op, 404, op.id, "Service not found")
+        elif isinstance(op, BatchDelete):
+            plan.deletes[index] = op.id
+        else:
+            stored = {column: getattr(current, column) for column in CONTENT_COLUMNS}
+            data = op.changes.model_dump(exclude_unset=True, mode="json")
+            if stored | data == stored:
+                results[index] = _result(index, op.op, 200, op.id)
+                continue
+            values = stored | data
+            values["id"] = op.id
+            values["content_hash"] = content_hash(values)
+            values["search_text"] = search_document(current.name, values["tags"])
+            plan.updates[index] = values
+    return plan
+
+
+def _succeeded(plan: _Plan) -> dict[int, BatchOperationResult]:
+    results = {
+        index: _result(index, "create", 201, values["id"])
+        for index, values in plan.inserts.items()
+    }
+    results.update(
+        (index, _result(index, "update", 200, values["id"]))
+        for index, values in plan.updates.items()
+    )
+    results.update(
+        (index, _result(index, "delete", 204, service_id))
+        for index, service_id in plan.deletes.items()
+    )
+    return results
+
+
+def _write(session: Session, plan: _Plan) -> dict[int, BatchOperationResult]:
+    """Apply ``plan`` inside a savepoint, raising ``IntegrityError`` on conflict."""
+    with session.begin_nested():
+        plan.apply(session)
+    return _succeeded(plan)
+
+
+def _write_each(
+    session: Session, batch: ServiceBatch, plan: _Plan, pending: list[int]
+) -> dict[int, BatchOperationResult]:
+    """Apply planned operations one savepoint at a time; conflicts become 409."""
+    results: dict[int, BatchOperationResult] = {}
+    for index in pending:
+        try:
+            results.update(_write(session, plan.only(index)))
+        except IntegrityError:
+            results[index] = _result(
+                index,
+                batch.operations[index].op,
+                409,
+                error="Conflicting concurrent write",
+            )
+    return results
+
+
+def apply_service_batch(session: Session, batch: ServiceBatch) -> ServiceBatchResult:
+    """Apply ``batch`` with one bulk statement per operation kind.
+
+    In ``atomic`` mode any failed operation leaves the database untouched and
+    the remaining operations are reported with status 424. In ``best_effort``
+    mode valid operations are written. If the bulk write hits a constraint
+    (a concurrent writer), operations are retried one savepoint at a time so
+    only the conflicting ones fail; an atomic batch does the same inside an
+    outer savepoint that is then rolled back, to report which operation
+    conflicted without writing anything.
+    """
+    results: dict[int, BatchOperationResult] = {}
+    plan = _plan(session, batch, results)
+    pending = sorted([*plan.inserts, *plan.updates, *plan.deletes])
+    atomic = batch.mode is BatchMode.atomic
+    committed = not (atomic and results)
+
+    if committed:
+        try:
+            results.update(_write(session, plan))
+        except IntegrityError:
+            if atomic:
+                committed = False
+                outer = session.begin_nested()
+                try:
+                    retried = _write_each(session, batch, plan, pending)
+                finally:
+                    outer.rollback()
+                results.update(
+                    (index, result)
+                    for index, result in retried.items()
+                    if result.status == 409
+                )
+            else:
+                results.update(_write_each(session, batch, plan, pending))
+    if not committed:
+        for index in pending:
+            results.setdefault(
+                index,
+                _result(index, batch.operations[index].op, 424, error="Batch aborted"),
+            )
+    return ServiceBatchResult(
+        committed=committed, results=[results[index] for index in sorted(results)]
+    )
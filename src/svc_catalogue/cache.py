@@ -0,0 +1,92 @@
+"""Process-local query caches invalidated by committed service writes."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any, Callable, Optional
+from weakref import WeakSet
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_SERVICES_CHANGED = "svc_catalogue.services_changed"
+
+_caches: WeakSet[WriteInvalidatedCache] = WeakSet()
+_commit_callbacks: list[Callable[[], None]] = []
+
+
+class WriteInvalidatedCache:
+    """Bounded TTL cache cleared whenever a session commits service writes.
+
+    Readers take :attr:`generation` before running their query and pass it to
+    :meth:`set`, so a value computed while a write committed is discarded
+    instead of being cached stale. The TTL bounds staleness caused by writes
+    committed by other processes.
+    """
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 1024) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        _caches.add(self)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, generation: int) -> None:
+        with self._lock:
+            if generation != self.generation or self.ttl_seconds <= 0:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+
+def invalidate_caches() -> None:
+    """Clear every write-invalidated cache in this process."""
+    for cache in list(_caches):
+        cache.clear()
+
+
+def on_services_committed(callback: Callable[[], None]) -> Callable[[], None]:
+    """Run ``callback`` after every commit that wrote services (usable as decorator)."""
+    _commit_callbacks.append(callback)
+    return callback
+
+
+def mark_services_changed(session: Session) -> None:
+    """Flag the session so caches are invalidated once its transaction commits."""
+    session.info[_SERVICES_CHANGED] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop(_SERVICES_CHANGED, False):
+        invalidate_caches()
+        for callback in list(_commit_callbacks):
+            callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop(_SERVICES_CHANGED, None)
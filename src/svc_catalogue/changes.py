@@ -0,0 +1,53 @@
+"""Wake-ups for change feed long-polls."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from .cache import on_services_committed
+
+
+class ChangeNotifier:
+    """Wakes waiting long-polls when this process commits a service write.
+
+    Commits happen on worker threads (sync engine) or the event loop (async
+    engine), so waiters are woken with ``call_soon_threadsafe``. Writes from
+    other processes are only seen by re-polling the database, which callers
+    do at least every ``change_feed_poll_seconds``.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    @contextmanager
+    def subscribe(self) -> Iterator[asyncio.Event]:
+        """Yield an event set by the next committed write.
+
+        Subscribe before reading the feed so a write committed between the
+        read and the wait is not missed.
+        """
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            yield waiter[1]
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+    def notify(self) -> None:
+        with self._lock:
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:  # loop already closed
+                pass
+
+
+change_notifier = ChangeNotifier()
+on_services_committed(change_notifier.notify)
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import Literal
+from typing import List, Literal, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -12,9 +12,45 @@ class Settings(BaseSettings):
     app_name: str = "Service Catalogue API"
     environment: Literal["dev", "test", "prod"] = "dev"
     database_url: str = "sqlite+pysqlite:///./svc_catalogue.db"
+    database_async: bool = False
+    async_database_url: Optional[str] = None
+    read_database_urls: List[str] = []
+    read_routing: Literal["round_robin", "least_connections"] = "round_robin"
+    read_replica_eject_seconds: float = 30.0
+    read_replica_check_seconds: float = 5.0
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = True
     auth_token: str = "change-me"
     log_level: str = "INFO"
     csv_max_rows: int = 10_000
+    csv_chunk_size: int = 500
+    csv_stream_max_rows: Optional[int] = None
+    csv_validation_workers: int = 0
+    csv_validation_batch_size: int = 250
+    export_batch_size: int = 1000
+    change_feed_max_wait_seconds: float = 30.0
+    change_feed_poll_seconds: float = 1.0
+    batch_max_operations: int = 500
+    lookup_max_keys: int = 500
+    count_cache_ttl_seconds: float = 30.0
+    read_model_enabled: bool = False
+    read_model_refresh_seconds: float = 1.0
+    read_model_search_candidates: int = 1000
+    probe_interval_seconds: float = 0.0
+    probe_concurrency: int = 50
+    probe_per_host_concurrency: int = 4
+    probe_timeout_seconds: float = 5.0
+    probe_jitter_seconds: float = 5.0
+    probe_max_body_bytes: int = 65536
+    search_backend: Literal["auto", "like"] = "auto"
+    search_similarity_threshold: float = 0.6
+    import_job_workers: int = 2
+    import_job_max_pending: int = 16
+    import_job_retention: int = 100
+    import_job_spool_dir: Optional[str] = None
 
     model_config = {
         "env_file": ".env",
@@ -2,15 +2,37 @@
 
 from __future__ import annotations
 
-from typing import Optional, Sequence, Tuple
-from uuid import UUID
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Mapping, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+from uuid import UUID, uuid4
 
-from sqlalchemy import String, cast, func, or_, select
+from sqlalchemy import (
+    bindparam,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.sql import ColumnElement, Select
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session
 
-from .models import Service
-from .schemas import ServiceCreate, ServiceUpdate
+from .cache import WriteInvalidatedCache, mark_services_changed
+from .config import settings
+from .models import Service, ServiceChange, ServiceEndpoint, ServiceTag, TagCount
+from .schemas import CountMode, ServiceCreate, ServiceUpdate
+from .search import get_search_backend, search_document
 
 
 class ServiceAlreadyExistsError(RuntimeError):
@@ -21,12 +43,84 @@ class ServiceNotFoundError(RuntimeError):
     """Raised when a service cannot be found."""
 
 
+_count_cache = WriteInvalidatedCache(settings.count_cache_ttl_seconds)
+_facet_cache = WriteInvalidatedCache(settings.count_cache_ttl_seconds)
+
+
+@dataclass(frozen=True)
+class ServiceFilter:
+    """Normalized list filters; hashable so it can key query caches."""
+
+    owner_team: Optional[str] = None
+    tier: Optional[str] = None
+    lifecycle: Optional[str] = None
+    search: Optional[str] = None
+    all_tags: frozenset[str] = frozenset()
+    any_tags: frozenset[str] = frozenset()
+
+    @classmethod
+    def build(
+        cls,
+        *,
+        owner_team: Optional[str] = None,
+        tier: Optional[str] = None,
+        lifecycle: Optional[str] = None,
+        search: Optional[str] = None,
+        all_tags: Iterable[str] = (),
+        any_tags: Iterable[str] = (),
+    ) -> ServiceFilter:
+        return cls(
+            owner_team=owner_team.lower() if owner_team else None,
+            tier=tier or None,
+            lifecycle=lifecycle or None,
+            search=search.lower() if search else None,
+            all_tags=frozenset(t.strip().lower() for t in all_tags if t.strip()),
+            any_tags=frozenset(t.strip().lower() for t in any_tags if t.strip()),
+        )
+
+
+CONTENT_COLUMNS = ("owner_team", "tier", "lifecycle", "endpoints", "tags")
+READ_COLUMNS = (
+    "id",
+    "name",
+    "owner_team",
+    "tier",
+    "lifecycle",
+    "endpoints",
+    "tags",
+    "created_at",
+    "updated_at",
+)
+_KEY_COLUMNS = ("id", "name", "updated_at")
+UPSERT_COLUMNS = CONTENT_COLUMNS + ("content_hash", "search_text")
+
+_UPSERT_DIALECTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+def content_hash(values: Mapping[str, Any]) -> str:
+    """Return a stable digest of the mutable columns of a service."""
+    encoded = json.dumps(
+        [values[column] for column in CONTENT_COLUMNS], separators=(",", ":")
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def service_values(service_in: ServiceCreate) -> dict[str, Any]:
+    """Return column values for a validated service payload."""
+    payload = service_in.model_dump(mode="python")
+    if payload.get("id") is None:
+        payload["id"] = uuid4()
+    payload["tier"] = service_in.tier.value
+    payload["lifecycle"] = service_in.lifecycle.value
+    payload["endpoints"] = [str(url) for url in payload["endpoints"]]
+    payload["content_hash"] = content_hash(payload)
+    payload["search_text"] = search_document(payload["name"], payload["tags"])
+    return payload
+
+
 def create_service(session: Session, service_in: ServiceCreate) -> Service:
     """Create a new service entry."""
-    payload = service_in.model_dump(mode="python")
-    if "endpoints" in payload:
-        payload["endpoints"] = [str(url) for url in payload["endpoints"]]
-    service = Service(**payload)
+    service = Service(**service_values(service_in))
     session.add(service)
     try:
         session.flush()
@@ -35,24 +129,746 @@ def create_service(session: Session, service_in: ServiceCreate) -> Service:
         raise ServiceAlreadyExistsError(
             "Service with this name already exists"
         ) from exc
+    _sync_derived(
+        session,
+        written={service.id: {"tags": service.tags, "endpoints": service.endpoints}},
+    )
     session.refresh(service)
     return service
 
 
-def get_service(session: Session, service_id: UUID) -> Service:
-    """Fetch a service by id."""
-    service = session.get(Service, service_id)
+def get_service(
+    session: Session, service_id: UUID, *, for_update: bool = False
+) -> Service:
+    """Fetch a service by id, optionally locking the row for this transaction."""
+    service = session.get(Service, service_id, with_for_update=for_update or None)
     if not service:
         raise ServiceNotFoundError("Service not found")
     return service
 
 
+def _read_columns(fields: Optional[Sequence[str]] = None) -> list[Any]:
+    """Columns to select for ``fields`` (default: all of :data:`READ_COLUMNS`).
+
+    ``id``, ``name``, ``updated_at`` and ``content_hash`` are always included:
+    routes need them for cursors and ETags, and none of them is a JSON column.
+    """
+    wanted = set(READ_COLUMNS if fields is None else fields) | set(_KEY_COLUMNS)
+    columns = [column for column in READ_COLUMNS if column in wanted]
+    return [getattr(Service, column) for column in columns] + [Service.content_hash]
+
+
+def get_service_row(
+    session: Session, service_id: UUID, *, fields: Optional[Sequence[str]] = None
+) -> Row:
+    """Fetch the readable columns of a service as a row, without an ORM object.
+
+    ``fields`` limits the selected columns; see :func:`_read_columns`.
+    """
+    row = session.exec(
+        select(*_read_columns(fields)).where(Service.id == service_id)
+    ).one_or_none()
+    if row is None:
+        raise ServiceNotFoundError("Service not found")
+    return row
+
+
 def get_service_by_name(session: Session, name: str) -> Optional[Service]:
     """Fetch a service by name."""
     statement = select(Service).where(func.lower(Service.name) == name.lower())
     return session.exec(statement).scalar_one_or_none()
 
 
+def lookup_services(
+    session: Session,
+    ids: Iterable[UUID] = (),
+    names: Iterable[str] = (),
+    *,
+    fields: Optional[Sequence[str]] = None,
+) -> Sequence[Row]:
+    """Read rows of the services matching any of ``ids`` or ``names``.
+
+    One statement: ``id IN (...) OR lower(name) IN (...)``, served by the
+    primary key and ``ix_service_name_lower``. Names match case-insensitively.
+    """
+    wanted_ids = set(ids)
+    lowered = {name.lower() for name in names}
+    criteria = []
+    if wanted_ids:
+        criteria.append(Service.id.in_(wanted_ids))
+    if lowered:
+        criteria.append(func.lower(Service.name).in_(lowered))
+    if not criteria:
+        return []
+    statement = select(*_read_columns(fields)).where(or_(*criteria))
+    return session.exec(statement.order_by(Service.name, Service.id)).all()
+
+
+def get_existing_by_names(session: Session, names: Sequence[str]) -> dict[str, Row]:
+    """Return ``(id, name, content_hash)`` rows keyed by lower-cased name."""
+    lowered = {name.lower() for name in names}
+    if not lowered:
+        return {}
+    statement = select(Service.id, Service.name, Service.content_hash).where(
+        func.lower(Service.name).in_(lowered)
+    )
+    return {row.name.lower(): row for row in session.execute(statement)}
+
+
+def bulk_upsert_services(session: Session, rows: Sequence[Mapping[str, Any]]) -> None:
+    """Insert or update many services keyed by name in as few statements as possible.
+
+    Rows that match an existing service must carry that service's stored ``id``
+    and ``name`` (see :func:`get_existing_by_names`); only the columns in
+    :data:`UPSERT_COLUMNS` are overwritten on conflict.
+    """
+    if not rows:
+        return
+    table = Service.__table__
+    dialect_insert = _UPSERT_DIALECTS.get(session.get_bind().dialect.name)
+    if dialect_insert is None:
+        _bulk_upsert_fallback(session, rows)
+        return
+    statement = dialect_insert(table)
+    set_ = {column: statement.excluded[column] for column in UPSERT_COLUMNS}
+    set_["updated_at"] = func.now()
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.name], set_=set_
+    ).returning(table.c.id, table.c.name)
+    by_name = {row["name"]: row for row in rows}
+    written = {
+        written_id: by_name[name]
+        for written_id, name in session.execute(statement, list(rows))
+    }
+    _sync_derived(session, written=written)
+
+
+def _bulk_upsert_fallback(session: Session, rows: Sequence[Mapping[str, Any]]) -> None:
+    """Split rows into batched INSERT and UPDATE executemany calls."""
+    existing = get_existing_by_names(session, [row["name"] for row in rows])
+    bulk_insert_services(
+        session, [row for row in rows if row["name"].lower() not in existing]
+    )
+    bulk_update_services(
+        session,
+        [
+            {**row, "id": existing[row["name"].lower()].id}
+            for row in rows
+            if row["name"].lower() in existing
+        ],
+    )
+
+
+def get_services_by_ids(session: Session, ids: Iterable[UUID]) -> dict[UUID, Row]:
+    """Return ``(id, name, content columns, content_hash)`` rows keyed by id."""
+    wanted = set(ids)
+    if not wanted:
+        return {}
+    columns = [getattr(Service, column) for column in CONTENT_COLUMNS]
+    statement = select(Service.id, Service.name, *columns, Service.content_hash).where(
+        Service.id.in_(wanted)
+    )
+    return {row.id: row for row in session.execute(statement)}
+
+
+def bulk_insert_services(session: Session, rows: Sequence[Mapping[str, Any]]) -> None:
+    """Insert new services (see :func:`service_values`) with one executemany."""
+    if not rows:
+        return
+    session.execute(insert(Service.__table__), [dict(row) for row in rows])
+    _sync_derived(session, written={row["id"]: row for row in rows})
+
+
+def bulk_update_services(session: Session, rows: Sequence[Mapping[str, Any]]) -> None:
+    """Overwrite :data:`UPSERT_COLUMNS` of existing services, keyed by ``id``."""
+    if not rows:
+        return
+    table = Service.__table__
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("_id"))
+        .values(updated_at=func.now())
+    )
+    session.execute(
+        statement,
+        [
+            {"_id": row["id"]} | {column: row[column] for column in UPSERT_COLUMNS}
+            for row in rows
+        ],
+    )
+    _sync_derived(session, written={row["id"]: row for row in rows})
+
+
+def bulk_delete_services(session: Session, ids: Sequence[UUID]) -> None:
+    """Delete services by id with one statement."""
+    if not ids:
+        return
+    _sync_derived(session, deleted=ids)
+    session.execute(delete(Service).where(Service.id.in_(ids)))
+
+
+def _sync_derived(
+    session: Session,
+    *,
+    written: Optional[Mapping[UUID, Mapping[str, Any]]] = None,
+    deleted: Sequence[UUID] = (),
+) -> None:
+    """Keep tables derived from ``service`` rows in step with a write.
+
+    ``written`` maps ids of inserted or updated services to their column
+    values and must be passed after the write; ``deleted`` must be passed
+    before the services are removed.
+    """
+    written = written or {}
+    mark_services_changed(session)
+    _sync_tags(session, written, deleted)
+    _sync_endpoints(session, written, deleted)
+    _record_changes(session, written, deleted)
+
+
+def _sync_tags(
+    session: Session,
+    written: Mapping[UUID, Mapping[str, Any]],
+    deleted: Sequence[UUID],
+) -> None:
+    service_ids = [*written, *deleted]
+    if not service_ids:
+        return
+    deltas: dict[str, int] = {}
+    previous = select(ServiceTag.tag).where(ServiceTag.service_id.in_(service_ids))
+    for tag in session.execute(previous).scalars():
+        deltas[tag] = deltas.get(tag, 0) - 1
+    session.execute(delete(ServiceTag).where(ServiceTag.service_id.in_(service_ids)))
+    assignments = [
+        {"service_id": service_id, "tag": tag}
+        for service_id, values in written.items()
+        for tag in dict.fromkeys(values["tags"])
+    ]
+    if assignments:
+        session.execute(insert(ServiceTag.__table__), assignments)
+    for assignment in assignments:
+        deltas[assignment["tag"]] = deltas.get(assignment["tag"], 0) + 1
+    _adjust_tag_counts(session, deltas)
+
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def endpoint_parts(url: str) -> tuple[str, str, int, str]:
+    """Split a URL into ``(scheme, host, port, path)`` as stored in
+    ``service_endpoint``; raises ``ValueError`` when it has no host."""
+    parts = urlsplit(url.strip())
+    if not parts.hostname:
+        raise ValueError(f"Not an absolute URL: {url!r}")
+    scheme = parts.scheme.lower()
+    port = parts.port or _DEFAULT_PORTS.get(scheme, 0)
+    path = "/" + parts.path.strip("/")
+    return scheme, parts.hostname.lower(), port, path
+
+
+def _path_prefixes(path: str) -> list[str]:
+    """``/a/b`` -> ``["/", "/a", "/a/b"]``: every segment-aligned prefix."""
+    segments = [segment for segment in path.split("/") if segment]
+    return ["/"] + ["/" + "/".join(segments[:n]) for n in range(1, len(segments) + 1)]
+
+
+def _sync_endpoints(
+    session: Session,
+    written: Mapping[UUID, Mapping[str, Any]],
+    deleted: Sequence[UUID],
+) -> None:
+    """Insert added and delete removed endpoints; unchanged rows keep their
+    probe results."""
+    service_ids = [*written, *deleted]
+    if not service_ids:
+        return
+    table = ServiceEndpoint.__table__
+    existing = set(
+        session.execute(
+            select(table.c.service_id, table.c.url).where(
+                table.c.service_id.in_(service_ids)
+            )
+        ).tuples()
+    )
+    wanted = {
+        (service_id, url): None
+        for service_id, values in written.items()
+        for url in values["endpoints"]
+    }
+    stale = existing.difference(wanted)
+    if stale:
+        session.execute(
+            delete(table).where(tuple_(table.c.service_id, table.c.url).in_(stale))
+        )
+    rows = []
+    for service_id, url in wanted:
+        if (service_id, url) in existing:
+            continue
+        scheme, host, port, path = endpoint_parts(url)
+        rows.append(
+            {
+                "service_id": service_id,
+                "url": url,
+                "scheme": scheme,
+                "host": host,
+                "port": port,
+                "path": path,
+            }
+        )
+    if rows:
+        session.execute(insert(table), rows)
+
+
+def _adjust_tag_counts(session: Session, deltas: Mapping[str, int]) -> None:
+    """Add ``deltas`` to ``tag_count`` and drop tags no service carries any more.
+
+    Counters are upserted as ``count = count + delta`` in tag order, so
+    concurrent writers lock the rows they share in the same order.
+    """
+    rows = [
+        {"tag": tag, "count": delta}
+        for tag, delta in sorted(deltas.items())
+        if delta != 0
+    ]
+    if not rows:
+        return
+    table = TagCount.__table__
+    dialect_insert = _UPSERT_DIALECTS.get(session.get_bind().dialect.name)
+    if dialect_insert is None:
+        existing = set(
+            session.execute(
+                select(table.c.tag).where(table.c.tag.in_([r["tag"] for r in rows]))
+            ).scalars()
+        )
+        updates = [
+            {"_tag": r["tag"], "delta": r["count"]}
+            for r in rows
+            if r["tag"] in existing
+        ]
+        if updates:
+            session.execute(
+                update(table)
+                .where(table.c.tag == bindparam("_tag"))
+                .values(count=table.c.count + bindparam("delta")),
+                updates,
+            )
+        inserts = [r for r in rows if r["tag"] not in existing]
+        if inserts:
+            session.execute(insert(table), inserts)
+    else:
+        statement = dialect_insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.tag],
+            set_={"count": table.c.count + statement.excluded.count},
+        )
+        session.execute(statement, rows)
+    removed = [r["tag"] for r in rows if r["count"] < 0]
+    if removed:
+        session.execute(
+            delete(table).where(table.c.tag.in_(removed), table.c.count <= 0)
+        )
+
+
+# Key of the transaction-scoped advisory lock serializing change-log writers.
+_CHANGE_LOCK_KEY = 0x53564343
+
+
+def _record_changes(
+    session: Session,
+    written: Mapping[UUID, Mapping[str, Any]],
+    deleted: Sequence[UUID],
+) -> None:
+    """Append ``created``/``updated``/``deleted`` entries to ``service_change``.
+
+    A written service counts as created when it has no earlier entry or its
+    latest one is a tombstone. On PostgreSQL writers take an advisory lock
+    held until commit, so sequence numbers become visible in commit order and
+    a feed reader never skips a sequence number that commits late.
+    """
+    if not written and not deleted:
+        return
+    if session.get_bind().dialect.name == "postgresql":
+        session.execute(select(func.pg_advisory_xact_lock(_CHANGE_LOCK_KEY)))
+    latest = {}
+    if written:
+        last_seq = (
+            select(func.max(ServiceChange.seq))
+            .where(ServiceChange.service_id.in_(list(written)))
+            .group_by(ServiceChange.service_id)
+        )
+        latest = dict(
+            session.execute(
+                select(ServiceChange.service_id, ServiceChange.op).where(
+                    ServiceChange.seq.in_(last_seq)
+                )
+            ).all()
+        )
+    created = [i for i in written if latest.get(i) in (None, "deleted")]
+    updated = [i for i in written if i not in created]
+    table = ServiceChange.__table__
+    for op, ids in (("created", created), ("updated", updated), ("deleted", deleted)):
+        if ids:
+            session.execute(
+                insert(table).from_select(
+                    ["service_id", "name", "op"],
+                    select(Service.id, Service.name, literal(op))
+                    .where(Service.id.in_(ids))
+                    .order_by(Service.name),
+                )
+            )
+
+
+def backfill_service_changes(session: Session) -> None:
+    """Seed ``service_change`` with a ``created`` entry per existing service."""
+    if session.execute(select(ServiceChange.seq).limit(1)).first() is not None:
+        return
+    session.execute(
+        insert(ServiceChange.__table__).from_select(
+            ["service_id", "name", "op"],
+            select(Service.id, Service.name, literal("created")).order_by(
+                Service.created_at, Service.name
+            ),
+        )
+    )
+
+
+def list_changes(session: Session, since: int = 0, limit: int = 100) -> Sequence[Row]:
+    """Change entries after sequence ``since``, oldest first.
+
+    Each row carries ``seq``, ``op``, ``service_id``, ``service_name`` and
+    ``changed_at`` plus the service's current :data:`READ_COLUMNS` (all
+    ``None`` once the service is deleted).
+    """
+    statement = (
+        select(
+            ServiceChange.seq,
+            ServiceChange.op,
+            ServiceChange.service_id,
+            ServiceChange.name.label("service_name"),
+            ServiceChange.changed_at,
+            *_read_columns(),
+        )
+        .select_from(ServiceChange)
+        .outerjoin(Service, Service.id == ServiceChange.service_id)
+        .where(ServiceChange.seq > since)
+        .order_by(ServiceChange.seq)
+        .limit(limit)
+    )
+    return session.exec(statement).all()
+
+
+def backfill_search_text(session: Session, batch_size: int = 1000) -> None:
+    """Fill ``search_text`` of services stored before it existed (still empty)."""
+    table = Service.__table__
+    statement = (
+        select(table.c.id, table.c.name, table.c.tags)
+        .where(table.c.search_text == "")
+        .limit(batch_size)
+    )
+    while rows := session.execute(statement).all():
+        session.execute(
+            update(table)
+            .where(table.c.id == bindparam("_id"))
+            .values(search_text=bindparam("search_text")),
+            [
+                {"_id": row.id, "search_text": search_document(row.name, row.tags)}
+                for row in rows
+            ],
+        )
+
+
+def backfill_service_tags(session: Session, batch_size: int = 1000) -> None:
+    """Populate ``service_tag`` from ``Service.tags`` if it is still empty."""
+    if session.execute(select(ServiceTag.tag).limit(1)).first() is not None:
+        return
+    statement = select(Service.id, Service.tags).execution_options(yield_per=batch_size)
+    for partition in session.execute(statement).partitions():
+        _sync_tags(session, {row.id: {"tags": row.tags} for row in partition}, ())
+
+
+def backfill_service_endpoints(session: Session, batch_size: int = 1000) -> None:
+    """Populate ``service_endpoint`` from ``Service.endpoints`` if it is still empty."""
+    if session.execute(select(ServiceEndpoint.url).limit(1)).first() is not None:
+        return
+    statement = select(Service.id, Service.endpoints).execution_options(
+        yield_per=batch_size
+    )
+    for partition in session.execute(statement).partitions():
+        _sync_endpoints(
+            session, {row.id: {"endpoints": row.endpoints} for row in partition}, ()
+        )
+
+
+def find_services_by_endpoint(
+    session: Session,
+    *,
+    url: Optional[str] = None,
+    host: Optional[str] = None,
+) -> Sequence[Row]:
+    """Services owning ``url`` or an endpoint on ``host``.
+
+    Rows carry the read columns plus the matching ``endpoint`` URL, ordered
+    by service name. A ``url`` matches endpoints on the same host and port
+    whose path is its longest segment-aligned prefix (``/api`` covers
+    ``/api/v1/x`` but not ``/apix``), so all candidate prefixes are looked
+    up with one ``IN`` on ``(host, port, path)``. A ``host`` matches every
+    endpoint on that host, whatever the port. Raises ``ValueError`` for a
+    ``url`` without a host.
+    """
+    statement = select(
+        *_read_columns(), ServiceEndpoint.url.label("endpoint"), ServiceEndpoint.path
+    ).join(ServiceEndpoint, ServiceEndpoint.service_id == Service.id)
+    if url is not None:
+        _, url_host, port, path = endpoint_parts(url)
+        statement = statement.where(
+            ServiceEndpoint.host == url_host,
+            ServiceEndpoint.port == port,
+            ServiceEndpoint.path.in_(_path_prefixes(path)),
+        )
+    elif host is not None:
+        statement = statement.where(ServiceEndpoint.host == host.strip().lower())
+    else:
+        return []
+    rows = session.exec(
+        statement.order_by(Service.name, Service.id, ServiceEndpoint.url)
+    ).all()
+    if url is not None and rows:
+        longest = max(len(row.path) for row in rows)
+        rows = [row for row in rows if len(row.path) == longest]
+    return rows
+
+
+def list_service_endpoints(session: Session, service_id: UUID) -> Sequence[Row]:
+    """Endpoints of one service with their latest probe results, by URL."""
+    statement = (
+        select(ServiceEndpoint.__table__)
+        .where(ServiceEndpoint.service_id == service_id)
+        .order_by(ServiceEndpoint.url)
+    )
+    return session.execute(statement).all()
+
+
+def list_probe_targets(session: Session) -> Sequence[Row]:
+    """Every endpoint as ``(service_id, service_name, url, host)``, by host."""
+    statement = (
+        select(
+            ServiceEndpoint.service_id,
+            Service.name.label("service_name"),
+            ServiceEndpoint.url,
+            ServiceEndpoint.host,
+        )
+        .join(Service, Service.id == ServiceEndpoint.service_id)
+        .order_by(ServiceEndpoint.host, ServiceEndpoint.url)
+    )
+    return session.execute(statement).all()
+
+
+def record_probe_results(
+    session: Session, results: Sequence[Mapping[str, Any]]
+) -> None:
+    """Store probe outcomes on their ``service_endpoint`` rows with one executemany.
+
+    ``results`` carry ``service_id``, ``url`` and the ``last_*`` columns.
+    Probe results are not service writes: caches, ETags and the change feed
+    are left alone, and endpoints removed meanwhile are skipped.
+    """
+    if not results:
+        return
+    table = ServiceEndpoint.__table__
+    statement = (
+        update(table)
+        .where(
+            table.c.service_id == bindparam("_service_id"),
+            table.c.url == bindparam("_url"),
+        )
+        .values(
+            last_status=bindparam("last_status"),
+            last_latency_ms=bindparam("last_latency_ms"),
+            last_error=bindparam("last_error"),
+            last_probed_at=bindparam("last_probed_at"),
+        )
+    )
+    session.execute(
+        statement,
+        [
+            {
+                "_service_id": result["service_id"],
+                "_url": result["url"],
+                "last_status": result["last_status"],
+                "last_latency_ms": result["last_latency_ms"],
+                "last_error": result["last_error"],
+                "last_probed_at": result["last_probed_at"],
+            }
+            for result in results
+        ],
+    )
+
+
+def backfill_tag_counts(session: Session) -> None:
+    """Populate ``tag_count`` from ``service_tag`` if it is still empty."""
+    if session.execute(select(TagCount.tag).limit(1)).first() is not None:
+        return
+    session.execute(
+        insert(TagCount).from_select(
+            ["tag", "count"],
+            select(ServiceTag.tag, func.count()).group_by(ServiceTag.tag),
+        )
+    )
+
+
+def list_tags(
+    session: Session, prefix: Optional[str] = None, limit: int = 20
+) -> Sequence[Row]:
+    """Most used tags starting with ``prefix`` as ``(tag, count)`` rows.
+
+    Reads only ``tag_count``: the prefix is an index range on ``tag``, and
+    the matches are ordered by descending count, then tag.
+    """
+    statement = select(TagCount.tag, TagCount.count)
+    prefix = (prefix or "").strip().lower()
+    if prefix:
+        if session.get_bind().dialect.name == "postgresql":
+            statement = statement.where(
+                TagCount.tag.startswith(prefix, autoescape=True)
+            )
+        else:
+            # A binary-collated range, which SQLite's LIKE cannot use an index for.
+            statement = statement.where(
+                TagCount.tag >= prefix, TagCount.tag < prefix + "\U0010ffff"
+            )
+    statement = statement.order_by(TagCount.count.desc(), TagCount.tag).limit(limit)
+    return session.execute(statement).all()
+
+
+def service_filters(
+    session: Session, filters: ServiceFilter
+) -> list[ColumnElement[bool]]:
+    """Build the WHERE criteria shared by list and count queries."""
+    criteria: list[ColumnElement[bool]] = []
+    if filters.owner_team:
+        criteria.append(func.lower(Service.owner_team) == filters.owner_team)
+    if filters.tier:
+        criteria.append(Service.tier == filters.tier)
+    if filters.lifecycle:
+        criteria.append(Service.lifecycle == filters.lifecycle)
+    for tag in sorted(filters.all_tags):
+        criteria.append(
+            Service.id.in_(select(ServiceTag.service_id).where(ServiceTag.tag == tag))
+        )
+    if filters.any_tags:
+        criteria.append(
+            Service.id.in_(
+                select(ServiceTag.service_id).where(
+                    ServiceTag.tag.in_(sorted(filters.any_tags))
+                )
+            )
+        )
+    if filters.search:
+        backend = get_search_backend(session.get_bind().dialect.name)
+        criteria.append(backend.criteria(filters.search))
+    return criteria
+
+
+def count_services(
+    session: Session,
+    filters: ServiceFilter,
+    mode: CountMode = CountMode.exact,
+) -> Optional[int]:
+    """Count services matching ``filters`` according to ``mode``.
+
+    Exact counts are cached per filter set until the next committed write.
+    ``estimate`` reads the planner's row estimate on PostgreSQL and falls back
+    to an exact count elsewhere.
+    """
+    if mode is CountMode.none:
+        return None
+    criteria = service_filters(session, filters)
+    if mode is CountMode.estimate and session.get_bind().dialect.name == "postgresql":
+        return _estimate_rows(session, select(Service.id).where(*criteria))
+
+    cached = _count_cache.get(filters)
+    if cached is not None:
+        return cached
+    generation = _count_cache.generation
+    statement = select(func.count()).select_from(Service).where(*criteria)
+    total = session.execute(statement).scalar_one()
+    _count_cache.set(filters, total, generation)
+    return total
+
+
+FACETS = ("tier", "lifecycle", "owner_team", "tags")
+
+
+def facet_counts(
+    session: Session, filters: ServiceFilter, *, top_tags: int = 10
+) -> dict[str, list[tuple[str, int]]]:
+    """Count services matching ``filters`` per value of each of :data:`FACETS`.
+
+    All facets come from one ``UNION ALL`` of grouped counts, each branch
+    applying the filters on its own so it can be answered from an index.
+    ``owner_team`` groups case-insensitively, like its filter, and reports
+    one of the spellings; ``tags`` is limited to the ``top_tags`` most used
+    tags. Values are ordered by descending count, then value. Results are
+    cached per filter set until the next committed write.
+    """
+    key = (filters, top_tags)
+    cached = _facet_cache.get(key)
+    if cached is not None:
+        return cached
+    generation = _facet_cache.generation
+
+    criteria = service_filters(session, filters)
+    count = func.count().label("count")
+    team = func.lower(Service.owner_team)
+    tags = select(ServiceTag.tag.label("value"), count)
+    if criteria:
+        tags = tags.where(
+            ServiceTag.service_id.in_(select(Service.id).where(*criteria))
+        )
+    top = (
+        tags.group_by(ServiceTag.tag)
+        .order_by(count.desc(), ServiceTag.tag)
+        .limit(top_tags)
+        .subquery()
+    )
+    statement = union_all(
+        select(literal("tier").label("facet"), Service.tier.label("value"), count)
+        .where(*criteria)
+        .group_by(Service.tier),
+        select(literal("lifecycle"), Service.lifecycle, count)
+        .where(*criteria)
+        .group_by(Service.lifecycle),
+        select(literal("owner_team"), func.min(Service.owner_team), count)
+        .where(*criteria)
+        .group_by(team),
+        select(literal("tags"), top.c.value, top.c.count),
+    )
+    facets: dict[str, list[tuple[str, int]]] = {facet: [] for facet in FACETS}
+    for row in session.execute(statement):
+        facets[row.facet].append((row.value, row.count))
+    for values in facets.values():
+        values.sort(key=lambda item: (-item[1], item[0]))
+    _facet_cache.set(key, facets, generation)
+    return facets
+
+
+def _estimate_rows(session: Session, statement: Select) -> int:
+    # Expanding IN parameters (tag filters) must be rendered into the SQL text,
+    # which exec_driver_sql passes to the driver as-is.
+    compiled = statement.compile(
+        dialect=session.get_bind().dialect,
+        compile_kwargs={"render_postcompile": True},
+    )
+    plan = (
+        session.connection()
+        .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+        .scalar_one()
+    )
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
 def list_services(
     session: Session,
     *,
@@ -60,60 +876,97 @@ def list_services(
     tier: Optional[str] = None,
     lifecycle: Optional[str] = None,
     search: Optional[str] = None,
+    all_tags: Iterable[str] = (),
+    any_tags: Iterable[str] = (),
+    after: Optional[Tuple[str, UUID]] = None,
     offset: int = 0,
     limit: int = 100,
-) -> Tuple[Sequence[Service], int]:
-    """List services with optional filters."""
-    statement = select(Service)
+    count: CountMode = CountMode.exact,
+    fields: Optional[Sequence[str]] = None,
+) -> Tuple[Sequence[Row], Optional[int]]:
+    """List services with optional filters, ordered by ``(name, id)``.
 
-    if owner_team:
-        statement = statement.where(
-            func.lower(Service.owner_team) == owner_team.lower()
-        )
-    if tier:
-        statement = statement.where(Service.tier == tier)
-    if lifecycle:
-        statement = statement.where(Service.lifecycle == lifecycle)
-    if search:
-        like_pattern = f"%{search.lower()}%"
-        tags_text = cast(Service.tags, String)
-        statement = statement.where(
-            or_(
-                func.lower(Service.name).like(like_pattern),
-                func.lower(tags_text).like(like_pattern),
-            )
-        )
+    Services are returned as rows of :data:`READ_COLUMNS` plus
+    ``content_hash`` rather than ORM objects, so callers can serialize them
+    without identity-map bookkeeping or model validation. ``fields`` narrows
+    the selected columns (see :func:`_read_columns`), so the ``endpoints`` and
+    ``tags`` JSON columns are only read when asked for.
 
-    count_stmt = statement.with_only_columns(func.count()).order_by(None)
-    total_row = session.exec(count_stmt).one()
-    if isinstance(total_row, tuple):
-        total = total_row[0]
-    elif hasattr(total_row, "__getitem__"):
-        total = total_row[0]
-    else:
-        total = total_row
+    ``all_tags`` keeps services carrying every listed tag and ``any_tags``
+    services carrying at least one; both resolve through ``service_tag``.
+    ``after`` is the ``(name, id)`` key of the last service of the previous
+    page; rows are then fetched by seeking past it instead of skipping
+    ``offset`` rows. ``count`` selects how the total is computed (see
+    :func:`count_services`); it is ``None`` for :attr:`CountMode.none`.
+
+    With ``search`` the search backend may rank results by relevance; keyset
+    pagination is then unavailable and ``after`` raises ``ValueError``.
+    """
+    filters = ServiceFilter.build(
+        owner_team=owner_team,
+        tier=tier,
+        lifecycle=lifecycle,
+        search=search,
+        all_tags=all_tags,
+        any_tags=any_tags,
+    )
+    total = count_services(session, filters, count)
+
+    statement = select(*_read_columns(fields)).where(*service_filters(session, filters))
+    rank = None
+    if filters.search:
+        rank = get_search_backend(session.get_bind().dialect.name).rank(filters.search)
+    if rank is not None:
+        if after is not None:
+            raise ValueError("Keyset pagination is not supported for ranked search")
+        statement = statement.order_by(rank.desc())
+    statement = statement.order_by(Service.name, Service.id)
+    if after is not None:
+        statement = statement.where(tuple_(Service.name, Service.id) > tuple_(*after))
     statement = statement.offset(offset).limit(limit)
-    raw_results = session.exec(statement).all()
-    services = [row if isinstance(row, Service) else row[0] for row in raw_results]
+    services = session.exec(statement).all()
     return services, total
 
 
+def iter_services(session: Session, *, batch_size: int = 1000) -> Iterator[Row]:
+    """Yield every service as a read row, ordered by ``(name, id)``.
+
+    ``yield_per`` makes the driver use a server-side cursor where it has one
+    (``stream_results`` on PostgreSQL), so only ``batch_size`` rows are held
+    in memory at a time.
+    """
+    statement = (
+        select(*_read_columns())
+        .order_by(Service.name, Service.id)
+        .execution_options(yield_per=batch_size)
+    )
+    yield from session.exec(statement)
+
+
 def update_service(
     session: Session, service: Service, service_in: ServiceUpdate
 ) -> Service:
-    """Update a service with partial changes."""
-    data = service_in.model_dump(exclude_unset=True, mode="python")
-    if "endpoints" in data and data["endpoints"] is not None:
-        data["endpoints"] = [str(url) for url in data["endpoints"]]
+    """Update a service with partial changes, skipping the write if nothing changed."""
+    data = service_in.model_dump(exclude_unset=True, mode="json")
+    current = {column: getattr(service, column) for column in CONTENT_COLUMNS}
+    if current | data == current:
+        return service
     for key, value in data.items():
         setattr(service, key, value)
+    service.content_hash = content_hash(current | data)
+    service.search_text = search_document(service.name, service.tags)
     session.add(service)
     session.flush()
+    _sync_derived(
+        session,
+        written={service.id: {"tags": service.tags, "endpoints": service.endpoints}},
+    )
     session.refresh(service)
     return service
 
 
 def delete_service(session: Session, service: Service) -> None:
     """Delete a service."""
+    _sync_derived(session, deleted=[service.id])
     session.delete(service)
     session.flush()
@@ -0,0 +1,111 @@
+"""Async counterparts of the :mod:`crud` functions used by the API.
+
+Each coroutine runs the synchronous implementation through ``run_sync``: on
+an :class:`~sqlmodel.ext.asyncio.session.AsyncSession` the queries execute on
+the event loop via the async driver, on a :class:`~.db.ThreadedSession` they
+run on the threadpool. Either way the SQL lives in one place, :mod:`crud`.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy.engine import Row
+
+from . import crud
+from .db import AsyncSessionLike
+from .models import Service
+from .schemas import ServiceCreate, ServiceUpdate
+
+
+async def create_service(
+    session: AsyncSessionLike, service_in: ServiceCreate
+) -> Service:
+    """Create a new service entry."""
+    return await session.run_sync(crud.create_service, service_in)
+
+
+async def get_service(
+    session: AsyncSessionLike, service_id: UUID, *, for_update: bool = False
+) -> Service:
+    """Fetch a service by id, optionally locking the row for this transaction."""
+    return await session.run_sync(crud.get_service, service_id, for_update=for_update)
+
+
+async def get_service_row(
+    session: AsyncSessionLike,
+    service_id: UUID,
+    *,
+    fields: Optional[Sequence[str]] = None,
+) -> Row:
+    """Fetch the readable columns of a service as a row."""
+    return await session.run_sync(crud.get_service_row, service_id, fields=fields)
+
+
+async def lookup_services(
+    session: AsyncSessionLike,
+    ids: Sequence[UUID] = (),
+    names: Sequence[str] = (),
+    *,
+    fields: Optional[Sequence[str]] = None,
+) -> Sequence[Row]:
+    """Read rows of the services matching any of ``ids`` or ``names``."""
+    return await session.run_sync(crud.lookup_services, ids, names, fields=fields)
+
+
+async def list_services(
+    session: AsyncSessionLike, **kwargs: Any
+) -> Tuple[Sequence[Row], Optional[int]]:
+    """List services; accepts the keyword arguments of :func:`crud.list_services`."""
+    return await session.run_sync(crud.list_services, **kwargs)
+
+
+async def facet_counts(
+    session: AsyncSessionLike, filters: crud.ServiceFilter, *, top_tags: int = 10
+) -> dict[str, list[tuple[str, int]]]:
+    """Per-value service counts for each facet under ``filters``."""
+    return await session.run_sync(crud.facet_counts, filters, top_tags=top_tags)
+
+
+async def find_services_by_endpoint(
+    session: AsyncSessionLike,
+    *,
+    url: Optional[str] = None,
+    host: Optional[str] = None,
+) -> Sequence[Row]:
+    """Services owning ``url`` (longest path prefix) or an endpoint on ``host``."""
+    return await session.run_sync(crud.find_services_by_endpoint, url=url, host=host)
+
+
+async def list_service_endpoints(
+    session: AsyncSessionLike, service_id: UUID
+) -> Sequence[Row]:
+    """Endpoints of one service with their latest probe results."""
+    return await session.run_sync(crud.list_service_endpoints, service_id)
+
+
+async def list_tags(
+    session: AsyncSessionLike, prefix: Optional[str] = None, limit: int = 20
+) -> Sequence[Row]:
+    """Most used tags starting with ``prefix``, with their service counts."""
+    return await session.run_sync(crud.list_tags, prefix, limit)
+
+
+async def update_service(
+    session: AsyncSessionLike, service: Service, service_in: ServiceUpdate
+) -> Service:
+    """Update a service with partial changes."""
+    return await session.run_sync(crud.update_service, service, service_in)
+
+
+async def delete_service(session: AsyncSessionLike, service: Service) -> None:
+    """Delete a service."""
+    await session.run_sync(crud.delete_service, service)
+
+
+async def list_changes(
+    session: AsyncSessionLike, since: int = 0, limit: int = 100
+) -> Sequence[Row]:
+    """Change entries after sequence ``since``, oldest first."""
+    return await session.run_sync(crud.list_changes, since, limit)
@@ -3,17 +3,27 @@
 from __future__ import annotations
 
 import csv
-from io import StringIO, TextIOBase
-from typing import Optional
+import math
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO, TextIOBase, TextIOWrapper
+from typing import Any, Callable, Iterator, Optional, Sequence, Union
 from uuid import UUID
 
 from fastapi import UploadFile
 from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
 from sqlmodel import Session
 
 from .config import settings
-from .crud import create_service, get_service_by_name, update_service
-from .schemas import CSVImportResult, ServiceCreate, ServiceUpdate
+from .crud import (
+    UPSERT_COLUMNS,
+    bulk_upsert_services,
+    get_existing_by_names,
+    service_values,
+)
+from .schemas import CSVImportChunk, CSVImportDiff, CSVImportResult, ServiceCreate
 
 EXPECTED_HEADERS = {
     "name",
@@ -26,6 +36,10 @@ EXPECTED_HEADERS = {
 }
 
 
+_validation_pool: Optional[ProcessPoolExecutor] = None
+_validation_pool_lock = threading.Lock()
+
+
 class CSVImportException(Exception):
     """Raised when the CSV import cannot proceed."""
 
@@ -44,20 +58,253 @@ def load_csv_content(upload: UploadFile) -> StringIO:
     """Read upload content as UTF-8 string buffer."""
     content = upload.file.read()
     if isinstance(content, bytes):
-        text = content.decode("utf-8")
+        try:
+            text = content.decode("utf-8")
+        except UnicodeDecodeError as exc:
+            raise CSVImportException(f"CSV is not valid UTF-8 ({exc})") from exc
     else:
         text = content
     return StringIO(text)
 
 
-def import_services_from_csv(session: Session, file_obj: TextIOBase) -> CSVImportResult:
-    """Create or update services from a CSV file."""
+def open_csv_stream(upload: UploadFile) -> TextIOWrapper:
+    """Wrap the upload in an incremental UTF-8 decoder for streaming imports."""
+    upload.file.seek(0)
+    return TextIOWrapper(upload.file, encoding="utf-8", newline="")
+
+
+def _row_to_payload(row: dict[str, str]) -> ServiceCreate:
+    return ServiceCreate(
+        id=_coerce_uuid(row.get("id")) or None,
+        name=row.get("name", ""),
+        owner_team=row.get("owner_team", ""),
+        tier=row.get("tier") or "",
+        lifecycle=row.get("lifecycle") or "",
+        endpoints=_parse_list(row.get("endpoints", "")),
+        tags=_parse_list(row.get("tags", "")),
+    )
+
+
+ValidatedRow = tuple[int, Union[dict[str, Any], str]]
+
+
+def validate_rows(rows: Sequence[tuple[int, dict[str, str]]]) -> list[ValidatedRow]:
+    """Validate numbered CSV rows into column values or a row error message.
+
+    Runs in validation worker processes, so it only takes and returns
+    picklable builtins.
+    """
+    validated: list[ValidatedRow] = []
+    for row_number, row in rows:
+        try:
+            validated.append((row_number, service_values(_row_to_payload(row))))
+        except (ValueError, ValidationError) as exc:
+            validated.append((row_number, f"row {row_number}: {exc}"))
+    return validated
+
+
+def _validation_executor() -> Optional[ProcessPoolExecutor]:
+    global _validation_pool
+    if settings.csv_validation_workers <= 0:
+        return None
+    with _validation_pool_lock:
+        if _validation_pool is None:
+            _validation_pool = ProcessPoolExecutor(
+                max_workers=settings.csv_validation_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _validation_pool
+
+
+def shutdown_validation_pool() -> None:
+    """Stop the validation worker processes, if any were started."""
+    global _validation_pool
+    with _validation_pool_lock:
+        pool, _validation_pool = _validation_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _submit_validation(
+    rows: list[tuple[int, dict[str, str]]],
+) -> Callable[[], list[ValidatedRow]]:
+    """Start validating a chunk; the returned callable waits for the result.
+
+    With worker processes the chunk is split into one batch per worker (at
+    most ``csv_validation_batch_size`` rows each), so every worker is busy
+    whatever the chunk size, and the batches run while the caller writes the
+    previous chunk. Without workers validation runs in-process when waited on.
+    """
+    executor = _validation_executor()
+    if executor is None:
+        return lambda: validate_rows(rows)
+    workers = settings.csv_validation_workers
+    batch_size = max(
+        1, min(settings.csv_validation_batch_size, math.ceil(len(rows) / workers))
+    )
+    futures = [
+        executor.submit(validate_rows, rows[i : i + batch_size])
+        for i in range(0, len(rows), batch_size)
+    ]
+    return lambda: [item for future in futures for item in future.result()]
+
+
+def _validate_chunk(rows: list[tuple[int, dict[str, str]]]) -> list[ValidatedRow]:
+    """Validate a chunk in-process or split into batches across worker processes."""
+    return _submit_validation(rows)()
+
+
+def _write_chunk(
+    session: Session,
+    chunk_values: list[dict[str, Any]],
+    seen: dict[str, dict[str, Any]],
+    *,
+    write: bool = True,
+) -> list[tuple[str, str]]:
+    """Classify every row of a chunk and upsert the ones that change something.
+
+    Returns ``(action, name)`` per row where action is ``created``, ``updated``
+    or ``unchanged``. ``seen`` maps lower-cased names to the latest values
+    classified so far; a dry run passes the same mapping for every chunk and
+    sets ``write`` to ``False``.
+    """
+    existing = get_existing_by_names(
+        session,
+        [
+            values["name"]
+            for values in chunk_values
+            if values["name"].lower() not in seen
+        ],
+    )
+    dirty: dict[str, dict[str, Any]] = {}
+    outcomes: list[tuple[str, str]] = []
+    for values in chunk_values:
+        key = values["name"].lower()
+        previous = seen.get(key)
+        if previous is None and key in existing:
+            previous = dict(existing[key]._mapping)
+        if previous is None:
+            action = "created"
+        else:
+            values = previous | {column: values[column] for column in UPSERT_COLUMNS}
+            unchanged = values["content_hash"] == previous["content_hash"]
+            action = "unchanged" if unchanged else "updated"
+        seen[key] = values
+        if action != "unchanged":
+            dirty[key] = values
+        outcomes.append((action, values["name"]))
+    if write:
+        bulk_upsert_services(session, list(dirty.values()))
+    return outcomes
+
+
+def _tally(result: CSVImportResult, outcomes: list[tuple[str, str]]) -> None:
+    for action, name in outcomes:
+        setattr(result, action, getattr(result, action) + 1)
+        if result.diff is not None:
+            getattr(result.diff, action).append(name)
+
+
+def _iter_rows(
+    reader: csv.DictReader, result: CSVImportResult
+) -> Iterator[dict[str, str]]:
+    try:
+        yield from reader
+    except UnicodeDecodeError as exc:
+        # Stop the whole import: reporting success would hide the rows that
+        # were never read.
+        detail = f"row {result.total_rows + 1}: invalid UTF-8 ({exc}); import aborted"
+        if result.chunks:
+            kept = sum(
+                chunk.last_row - chunk.first_row + 1
+                for chunk in result.chunks
+                if chunk.committed
+            )
+            detail += f", {kept} rows before it were already committed"
+        raise CSVImportException(detail) from exc
+
+
+def _apply_chunk(
+    session: Session,
+    chunk: list[tuple[int, dict[str, str]]],
+    validated: Callable[[], list[ValidatedRow]],
+    result: CSVImportResult,
+    planned: Optional[dict[str, dict[str, Any]]],
+) -> None:
+    payloads: list[dict[str, Any]] = []
+    for _, outcome in validated():
+        if isinstance(outcome, str):
+            result.errors.append(outcome)
+        else:
+            payloads.append(outcome)
+
+    write = planned is None
+    seen = {} if planned is None else planned
+    if result.chunks is None:
+        _tally(result, _write_chunk(session, payloads, seen, write=write))
+        return
+
+    first_row, last_row = chunk[0][0], chunk[-1][0]
+    try:
+        outcomes = _write_chunk(session, payloads, seen, write=write)
+        if write:
+            session.commit()
+    except SQLAlchemyError as exc:
+        session.rollback()
+        reason = getattr(exc, "orig", None) or exc
+        result.errors.append(f"rows {first_row}-{last_row}: {reason}")
+        outcomes = []
+        committed = False
+    else:
+        _tally(result, outcomes)
+        committed = write
+    actions = [action for action, _ in outcomes]
+    result.chunks.append(
+        CSVImportChunk(
+            index=len(result.chunks),
+            first_row=first_row,
+            last_row=last_row,
+            created=actions.count("created"),
+            updated=actions.count("updated"),
+            unchanged=actions.count("unchanged"),
+            committed=committed,
+        )
+    )
+
+
+def import_services_from_csv(
+    session: Session,
+    file_obj: TextIOBase,
+    *,
+    commit_chunks: bool = False,
+    dry_run: bool = False,
+    progress: Optional[Callable[[CSVImportResult], None]] = None,
+) -> CSVImportResult:
+    """Create or update services from a CSV file.
+
+    Rows are validated and written in chunks of ``settings.csv_chunk_size``:
+    validation optionally fans out across ``settings.csv_validation_workers``
+    processes, one query resolves existing names for the chunk and one bulk
+    upsert writes it. With ``commit_chunks`` every chunk is committed on its own, a
+    failing chunk is rolled back without aborting the import, the result
+    lists each chunk, and ``settings.csv_stream_max_rows`` replaces the
+    ``csv_max_rows`` guard. ``progress`` is called with the running result
+    after every chunk.
+
+    Rows whose content hash matches the stored service are counted as
+    ``unchanged`` and not written. ``dry_run`` writes nothing and returns the
+    names that would be created, updated or left unchanged in ``diff``.
+    """
     reader = csv.DictReader(file_obj)
-    if reader.fieldnames is None:
+    try:
+        fieldnames = reader.fieldnames
+    except UnicodeDecodeError as exc:
+        raise CSVImportException(f"CSV header is not valid UTF-8 ({exc})") from exc
+    if fieldnames is None:
         raise CSVImportException("CSV missing header row")
 
-    unknown = set(reader.fieldnames) - EXPECTED_HEADERS
-    missing = EXPECTED_HEADERS - set(reader.fieldnames)
+    unknown = set(fieldnames) - EXPECTED_HEADERS
+    missing = EXPECTED_HEADERS - set(fieldnames)
     if unknown:
         raise CSVImportException(f"Unknown columns: {', '.join(sorted(unknown))}")
     if missing - {"id"}:
@@ -65,52 +312,48 @@ def import_services_from_csv(session: Session, file_obj: TextIOBase) -> CSVImpor
             f"Missing required columns: {', '.join(sorted(missing - {'id'}))}"
         )
 
-    created = 0
-    updated = 0
-    errors: list[str] = []
-    total_rows = 0
+    max_rows = settings.csv_stream_max_rows if commit_chunks else settings.csv_max_rows
+    result = CSVImportResult(
+        created=0,
+        updated=0,
+        total_rows=0,
+        chunks=[] if commit_chunks else None,
+        diff=CSVImportDiff() if dry_run else None,
+    )
+    planned: Optional[dict[str, dict[str, Any]]] = {} if dry_run else None
+    chunk: list[tuple[int, dict[str, str]]] = []
+    pending: Optional[
+        tuple[list[tuple[int, dict[str, str]]], Callable[[], list[ValidatedRow]]]
+    ] = None
 
-    for row in reader:
-        total_rows += 1
-        if total_rows > settings.csv_max_rows:
-            errors.append(
-                f"row {total_rows}: exceeded maximum allowed rows ({settings.csv_max_rows})"
+    def advance(next_chunk: list[tuple[int, dict[str, str]]]) -> None:
+        # Queue validation of ``next_chunk`` before writing the pending chunk,
+        # so worker processes validate while the database writes.
+        nonlocal pending
+        queued = (next_chunk, _submit_validation(next_chunk)) if next_chunk else None
+        if pending is not None:
+            _apply_chunk(session, *pending, result, planned)
+            if progress is not None:
+                progress(result)
+        pending = queued
+
+    for row in _iter_rows(reader, result):
+        result.total_rows += 1
+        if max_rows is not None and result.total_rows > max_rows:
+            advance(chunk)
+            advance([])
+            chunk = []
+            result.errors.append(
+                f"row {result.total_rows}: exceeded maximum allowed rows ({max_rows})"
             )
             break
-        try:
-            endpoints = _parse_list(row.get("endpoints", ""))
-            tags = _parse_list(row.get("tags", ""))
-            payload = ServiceCreate(
-                id=_coerce_uuid(row.get("id")) or None,
-                name=row.get("name", ""),
-                owner_team=row.get("owner_team", ""),
-                tier=row.get("tier") or "",
-                lifecycle=row.get("lifecycle") or "",
-                endpoints=endpoints,
-                tags=tags,
-            )
-        except (ValueError, ValidationError) as exc:
-            errors.append(f"row {total_rows}: {exc}")
-            continue
-
-        existing = get_service_by_name(session, payload.name)
-        if existing:
-            update_data = ServiceUpdate(
-                owner_team=payload.owner_team,
-                tier=payload.tier,
-                lifecycle=payload.lifecycle,
-                endpoints=payload.endpoints,
-                tags=payload.tags,
-            )
-            update_service(session, existing, update_data)
-            updated += 1
-        else:
-            create_service(session, payload)
-            created += 1
-
-    return CSVImportResult(
-        created=created,
-        updated=updated,
-        errors=errors,
-        total_rows=total_rows,
-    )
+        chunk.append((result.total_rows, row))
+
+        if len(chunk) >= settings.csv_chunk_size:
+            advance(chunk)
+            chunk = []
+
+    advance(chunk)
+    advance([])
+
+    return result
@@ -2,33 +2,142 @@
 
 from __future__ import annotations
 
-from contextlib import contextmanager
-from typing import Iterator
+import asyncio
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Iterator, Optional, TypeVar, Union
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlalchemy.pool import StaticPool
 from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
 from .config import settings
+from .crud import (
+    backfill_search_text,
+    backfill_service_changes,
+    backfill_service_endpoints,
+    backfill_service_tags,
+    backfill_tag_counts,
+)
+from .metrics import instrument_pool, timed_checkout
+from .replicas import Replica, ReplicaRouter
+from .search import configure_engine, get_search_backend
+
+
+def engine_options(url: str, name: str) -> dict[str, Any]:
+    """Pool configuration from ``Settings`` for an engine on ``url``.
+
+    In-memory SQLite keeps a single shared connection; every other URL gets
+    the dialect's queue pool, logged as ``name``.
+    """
+    options: dict[str, Any] = {"pool_pre_ping": settings.db_pool_pre_ping}
+    if ":memory:" in url:
+        options["poolclass"] = StaticPool
+        return options
+    options.update(
+        pool_logging_name=name,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+    )
+    return options
 
-connect_args: dict[str, object] = {}
-engine_kwargs: dict[str, object] = {"pool_pre_ping": True}
 
+connect_args: dict[str, object] = {}
 if settings.database_url.startswith("sqlite"):
     connect_args["check_same_thread"] = False
-    if ":memory:" in settings.database_url:
-        engine_kwargs["poolclass"] = StaticPool
 
 _engine = create_engine(
     settings.database_url,
     connect_args=connect_args,
-    **engine_kwargs,
+    **engine_options(settings.database_url, "primary"),
+)
+configure_engine(_engine)
+instrument_pool(_engine, "primary")
+
+T = TypeVar("T")
+
+_ASYNC_DRIVERS = {"postgresql": "postgresql+psycopg", "sqlite": "sqlite+aiosqlite"}
+_async_engine: Optional[AsyncEngine] = None
+
+
+def async_database_url(url: str) -> str:
+    """Map ``url`` onto the async driver of its dialect (psycopg, aiosqlite)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r}")
+    return parsed.set(drivername=_ASYNC_DRIVERS[backend]).render_as_string(
+        hide_password=False
+    )
+
+
+def _create_async_engine(url: str, name: str) -> AsyncEngine:
+    engine = create_async_engine(url, **engine_options(url, name))
+    configure_engine(engine.sync_engine)
+    instrument_pool(engine.sync_engine, name)
+    return engine
+
+
+def get_async_engine() -> AsyncEngine:
+    """Return the async engine, creating it on first use."""
+    global _async_engine
+    if _async_engine is None:
+        url = settings.async_database_url or async_database_url(settings.database_url)
+        _async_engine = _create_async_engine(url, "primary_async")
+    return _async_engine
+
+
+def create_replica(url: str, name: str) -> Replica:
+    """Sync engine (and lazy async engine) for a read replica at ``url``."""
+    connect = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect, **engine_options(url, name))
+    configure_engine(engine)
+    instrument_pool(engine, name)
+    return Replica(
+        name=name,
+        engine=engine,
+        async_factory=lambda: _create_async_engine(
+            async_database_url(url), f"{name}_async"
+        ),
+    )
+
+
+read_replicas = ReplicaRouter(
+    [
+        create_replica(url, f"replica_{index}")
+        for index, url in enumerate(settings.read_database_urls)
+    ],
+    routing=settings.read_routing,
+    eject_seconds=settings.read_replica_eject_seconds,
 )
 
 
 def init_db() -> None:
-    """Create database tables."""
+    """Create database tables and search indexes."""
     SQLModel.metadata.create_all(_engine)
+    # Before the search indexes are built, so they cover existing services.
+    with get_session() as session:
+        backfill_search_text(session)
+    with _engine.begin() as connection:
+        get_search_backend(connection.dialect.name).install(connection)
+    with get_session() as session:
+        backfill_service_tags(session)
+        backfill_tag_counts(session)
+        backfill_service_endpoints(session)
+        backfill_service_changes(session)
+
+
+def _check_out(session: Session) -> None:
+    """Check the session's connection out now, timing the wait for the pool
+    metrics."""
+    with timed_checkout(session.get_bind()):
+        session.connection()
 
 
 @contextmanager
@@ -36,6 +145,7 @@ def get_session() -> Iterator[Session]:
     """Provide a transactional scope around a series of operations."""
     session = Session(_engine)
     try:
+        _check_out(session)
         yield session
         session.commit()
     except Exception:
@@ -43,3 +153,175 @@ def get_session() -> Iterator[Session]:
         raise
     finally:
         session.close()
+
+
+class ThreadedSession:
+    """Sync :class:`Session` exposing :class:`AsyncSession`'s ``run_sync``.
+
+    Used when ``database_async`` is off: each call runs on Starlette's
+    threadpool so async routes work unchanged against the sync engine.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self.sync_session = session
+
+    async def run_sync(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+
+def _lost_connection(error: exc.DBAPIError) -> bool:
+    return error.connection_invalidated or isinstance(
+        error, (exc.OperationalError, exc.InterfaceError)
+    )
+
+
+class ReplicaSession:
+    """Read session on a replica that falls back to the primary.
+
+    If a call fails because the replica is unreachable, the replica is
+    ejected and the call is retried once on a new primary session, which
+    also serves the rest of the request.
+    """
+
+    def __init__(
+        self, replica: Replica, session: Union[AsyncSession, ThreadedSession]
+    ) -> None:
+        self.replica: Optional[Replica] = replica
+        self.session = session
+
+    async def run_sync(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if self.replica is None:
+            return await self.session.run_sync(fn, *args, **kwargs)
+        try:
+            return await self.session.run_sync(fn, *args, **kwargs)
+        except exc.DBAPIError as error:
+            if not _lost_connection(error):
+                raise
+            read_replicas.eject(self.replica)
+            self.replica = None
+            failed, self.session = self.session, _new_session(None)
+            try:
+                await failed.rollback()
+                await failed.close()
+            except (exc.DBAPIError, OSError):
+                pass
+        return await self.session.run_sync(fn, *args, **kwargs)
+
+    async def commit(self) -> None:
+        await self.session.commit()
+
+    async def rollback(self) -> None:
+        await self.session.rollback()
+
+    async def close(self) -> None:
+        await self.session.close()
+
+
+AsyncSessionLike = Union[AsyncSession, ThreadedSession, ReplicaSession]
+
+
+def _new_session(bind: Union[Engine, AsyncEngine, None]) -> AsyncSessionLike:
+    if settings.database_async:
+        return AsyncSession(bind or get_async_engine())
+    return ThreadedSession(Session(bind or _engine))
+
+
+@asynccontextmanager
+async def get_async_session(
+    bind: Union[Engine, AsyncEngine, None] = None,
+) -> AsyncIterator[AsyncSessionLike]:
+    """Async transactional scope; native async engine when ``database_async``.
+
+    ``bind`` overrides the primary engine (an :class:`AsyncEngine` in async
+    mode, an :class:`Engine` otherwise).
+    """
+    async with _session_scope(_new_session(bind)) as session:
+        yield session
+
+
+@asynccontextmanager
+async def _session_scope(session: AsyncSessionLike) -> AsyncIterator[AsyncSessionLike]:
+    try:
+        await session.run_sync(_check_out)
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+def _check_connection(engine: Engine) -> None:
+    with engine.connect() as connection:
+        connection.exec_driver_sql("SELECT 1")
+
+
+async def _check_replica(replica: Replica) -> None:
+    try:
+        if settings.database_async:
+            async with replica.async_engine().connect() as connection:
+                await connection.exec_driver_sql("SELECT 1")
+        else:
+            await run_in_threadpool(_check_connection, replica.engine)
+    except (exc.DBAPIError, OSError):
+        read_replicas.eject(replica)
+    finally:
+        replica.checked_at = time.monotonic()
+        replica.checking = False
+
+
+_health_checks: set[asyncio.Task[None]] = set()
+
+
+def _schedule_health_checks() -> None:
+    """Start background checks of replicas not checked for
+    ``read_replica_check_seconds``; requests never wait for them."""
+    loop = asyncio.get_running_loop()
+    for replica in read_replicas.due_for_check(settings.read_replica_check_seconds):
+        task = loop.create_task(_check_replica(replica))
+        _health_checks.add(task)
+        task.add_done_callback(_health_checks.discard)
+
+
+def _read_bind() -> Optional[Replica]:
+    """Next healthy replica by the routing policy, else ``None``."""
+    _schedule_health_checks()
+    candidates = read_replicas.candidates(is_async=settings.database_async)
+    return candidates[0] if candidates else None
+
+
+@asynccontextmanager
+async def get_read_session(*, primary: bool = False) -> AsyncIterator[AsyncSessionLike]:
+    """Session for read-only requests, on a healthy replica when configured.
+
+    ``primary`` (read-your-writes) and an empty or fully ejected replica set
+    use the primary; a replica that fails mid-request is replaced by it.
+    """
+    replica = None if primary else _read_bind()
+    if replica is None:
+        async with get_async_session() as session:
+            yield session
+        return
+    bind = replica.async_engine() if settings.database_async else replica.engine
+    # The checkout in ``_session_scope`` already fails over to the primary.
+    async with _session_scope(ReplicaSession(replica, _new_session(bind))) as session:
+        yield session
+
+
+async def dispose_async_engine() -> None:
+    """Close the async engine's and the replicas' pooled connections."""
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+    await read_replicas.dispose()
@@ -0,0 +1,77 @@
+"""Streaming catalogue export in NDJSON and CSV."""
+
+from __future__ import annotations
+
+import csv
+from io import StringIO
+from typing import Iterable, Iterator, Union
+
+import orjson
+from sqlalchemy.engine import Row
+
+from .config import settings
+from .crud import READ_COLUMNS, iter_services
+from .db import get_session
+
+CSV_COLUMNS = ("id", "name", "owner_team", "tier", "lifecycle", "endpoints", "tags")
+
+
+def _batches(rows: Iterable[Row], size: int) -> Iterator[list[Row]]:
+    batch: list[Row] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def ndjson_lines(rows: Iterable[Row], batch_size: int) -> Iterator[bytes]:
+    """One JSON object per service (the ``ServiceRead`` fields), per line."""
+    option = orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE
+    for batch in _batches(rows, batch_size):
+        yield b"".join(
+            orjson.dumps(
+                {column: row._mapping[column] for column in READ_COLUMNS},
+                option=option,
+            )
+            for row in batch
+        )
+
+
+def csv_lines(rows: Iterable[Row], batch_size: int) -> Iterator[str]:
+    """CSV in the format :func:`csv_import.import_services_from_csv` reads."""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for batch in _batches(rows, batch_size):
+        for row in batch:
+            writer.writerow(
+                (
+                    str(row.id),
+                    row.name,
+                    row.owner_team,
+                    row.tier,
+                    row.lifecycle,
+                    ";".join(row.endpoints or []),
+                    ";".join(row.tags or []),
+                )
+            )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_export(fmt: str) -> Iterator[Union[bytes, str]]:
+    """Stream the whole catalogue as ``ndjson`` or ``csv`` from its own session.
+
+    The session stays open for as long as the response is being sent, so the
+    export reads one consistent result set through a server-side cursor.
+    """
+    batch_size = settings.export_batch_size
+    writer = ndjson_lines if fmt == "ndjson" else csv_lines
+    with get_session() as session:
+        yield from writer(iter_services(session, batch_size=batch_size), batch_size)
@@ -0,0 +1,197 @@
+"""Background CSV import jobs."""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+from uuid import UUID, uuid4
+
+from fastapi import UploadFile
+
+from .config import settings
+from .csv_import import CSVImportException, import_services_from_csv
+from .db import get_session
+from .schemas import CSVImportResult, ImportJobRead, ImportJobStatus
+
+
+class ImportJobQueueFullError(RuntimeError):
+    """Raised when too many import jobs are already pending or the worker
+    pool is shutting down."""
+
+
+class ImportJobNotFoundError(RuntimeError):
+    """Raised when an import job id is unknown."""
+
+
+@dataclass
+class _ImportJob:
+    path: Path
+    state: ImportJobRead
+    future: Optional[Future[None]] = field(default=None, repr=False)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class ImportJobManager:
+    """Spool uploads to disk and import them on a bounded worker pool.
+
+    Job state lives in process memory, so progress is only visible on the
+    worker that accepted the upload.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._jobs: OrderedDict[UUID, _ImportJob] = OrderedDict()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def submit(self, upload: UploadFile) -> ImportJobRead:
+        """Store the upload and queue it for import."""
+        with self._lock:
+            pending = sum(
+                1
+                for job in self._jobs.values()
+                if job.state.status in (ImportJobStatus.queued, ImportJobStatus.running)
+            )
+            if pending >= settings.import_job_max_pending:
+                raise ImportJobQueueFullError("Too many pending import jobs")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.import_job_workers,
+                    thread_name_prefix="csv-import",
+                )
+            executor = self._executor
+            # Reserve the slot before the copy releases the lock.
+            handle, name = tempfile.mkstemp(
+                suffix=".csv", dir=settings.import_job_spool_dir
+            )
+            job = _ImportJob(
+                path=Path(name),
+                state=ImportJobRead(
+                    id=uuid4(), status=ImportJobStatus.queued, submitted_at=_now()
+                ),
+            )
+            self._jobs[job.state.id] = job
+
+        try:
+            with open(handle, "wb") as spool:
+                upload.file.seek(0)
+                shutil.copyfileobj(upload.file, spool)
+            with self._lock:
+                if self._executor is not executor:
+                    raise ImportJobQueueFullError("Import jobs are shutting down")
+                job.future = executor.submit(self._run, job)
+                self._evict_finished()
+                return job.state.model_copy(deep=True)
+        except BaseException:
+            with self._lock:
+                self._jobs.pop(job.state.id, None)
+            job.path.unlink(missing_ok=True)
+            raise
+
+    def get(self, job_id: UUID) -> ImportJobRead:
+        """Return a snapshot of the job state."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise ImportJobNotFoundError("Import job not found")
+            return job.state.model_copy(deep=True)
+
+    def wait(self, job_id: UUID, timeout: Optional[float] = None) -> ImportJobRead:
+        """Block until the job finishes and return its final state."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise ImportJobNotFoundError("Import job not found")
+        if job.future is not None:
+            try:
+                job.future.result(timeout=timeout)
+            except CancelledError:
+                pass
+        return self.get(job_id)
+
+    def shutdown(self) -> None:
+        """Stop accepting work and fail jobs that have not started."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            cancelled = [
+                job
+                for job in self._jobs.values()
+                if job.future is not None and job.future.cancelled()
+            ]
+        for job in cancelled:
+            self._update(
+                job,
+                status=ImportJobStatus.failed,
+                detail="Cancelled at shutdown",
+                finished_at=_now(),
+            )
+            job.path.unlink(missing_ok=True)
+
+    def _update(self, job: _ImportJob, **changes: object) -> None:
+        with self._lock:
+            job.state = job.state.model_copy(update=changes)
+
+    def _record_progress(self, job: _ImportJob, result: CSVImportResult) -> None:
+        self._update(
+            job,
+            rows_processed=result.total_rows,
+            created=result.created,
+            updated=result.updated,
+            unchanged=result.unchanged,
+            errors=list(result.errors),
+        )
+
+    def _run(self, job: _ImportJob) -> None:
+        self._update(job, status=ImportJobStatus.running, started_at=_now())
+        try:
+            with job.path.open(encoding="utf-8", newline="") as handle:
+                with get_session() as session:
+                    result = import_services_from_csv(
+                        session,
+                        handle,
+                        commit_chunks=True,
+                        progress=lambda current: self._record_progress(job, current),
+                    )
+        except CSVImportException as exc:
+            self._update(
+                job, status=ImportJobStatus.failed, detail=str(exc), finished_at=_now()
+            )
+        except Exception as exc:  # pragma: no cover - unexpected worker failure
+            self._update(
+                job,
+                status=ImportJobStatus.failed,
+                detail=f"Import failed: {exc.__class__.__name__}",
+                finished_at=_now(),
+            )
+        else:
+            self._record_progress(job, result)
+            self._update(job, status=ImportJobStatus.succeeded, finished_at=_now())
+        finally:
+            job.path.unlink(missing_ok=True)
+
+    def _evict_finished(self) -> None:
+        finished = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.state.finished_at is not None
+        ]
+        for job_id in finished[
+            : max(0, len(self._jobs) - settings.import_job_retention)
+        ]:
+            del self._jobs[job_id]
+
+
+import_jobs = ImportJobManager()
@@ -9,9 +9,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from .api import ops
-from .api.v1 import services
+from .api.v1 import services, tags
 from .config import settings
-from .db import init_db
+from .csv_import import shutdown_validation_pool
+from .db import dispose_async_engine, init_db
+from .jobs import import_jobs
+from .prober import probe_scheduler
 
 app = FastAPI(
     title=settings.app_name,
@@ -28,6 +31,7 @@ app.add_middleware(
 
 app.include_router(ops.router)
 app.include_router(services.router, prefix="/api/v1")
+app.include_router(tags.router, prefix="/api/v1")
 
 Instrumentator().instrument(app).expose(app, include_in_schema=False)
 
@@ -37,6 +41,19 @@ def on_startup() -> None:
     init_db()
 
 
+@app.on_event("startup")
+async def start_prober() -> None:
+    probe_scheduler.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    await probe_scheduler.stop()
+    import_jobs.shutdown()
+    shutdown_validation_pool()
+    await dispose_async_engine()
+
+
 @app.get("/", tags=["meta"])
 def read_root() -> dict[str, Any]:
     """Simple index endpoint."""
@@ -0,0 +1,110 @@
+"""Prometheus metrics for database connection pools.
+
+Collectors register on the default registry, which ``/metrics`` exposes via
+``prometheus-fastapi-instrumentator``. Every series is labelled by pool name
+so the primary (and any other engines) can be sized independently.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Callable, Iterator, Optional
+from weakref import WeakKeyDictionary, WeakValueDictionary
+
+from prometheus_client import REGISTRY, Counter, Histogram
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool, QueuePool
+
+POOL_CHECKOUT_SECONDS = Histogram(
+    "svc_catalogue_db_pool_checkout_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+POOL_CHECKOUT_TIMEOUTS = Counter(
+    "svc_catalogue_db_pool_checkout_timeouts",
+    "Checkouts that gave up after pool_timeout",
+    ["pool"],
+)
+
+
+# Set by ``timed_checkout`` and read by the ``checkout`` listener of the pool
+# that hands out the connection; asyncio tasks and SQLAlchemy's greenlets
+# each see their own value.
+_checkout_started: ContextVar[Optional[float]] = ContextVar(
+    "checkout_started", default=None
+)
+_pool_names: WeakKeyDictionary[Pool, str] = WeakKeyDictionary()
+
+
+@contextmanager
+def timed_checkout(engine: Engine) -> Iterator[None]:
+    """Record how long the block waits for a connection of ``engine``.
+
+    SQLAlchemy has no public event before a checkout starts, so the wait is
+    measured from here to the pool's ``checkout`` event; checkouts that give
+    up after ``pool_timeout`` are counted as timeouts.
+    """
+    token = _checkout_started.set(perf_counter())
+    try:
+        yield
+    except exc.TimeoutError:
+        name = _pool_names.get(engine.pool)
+        if name is not None:
+            POOL_CHECKOUT_TIMEOUTS.labels(name).inc()
+        raise
+    finally:
+        _checkout_started.reset(token)
+
+
+def _checkout_listener(name: str) -> Callable[..., None]:
+    def on_checkout(*_: Any) -> None:
+        start = _checkout_started.get()
+        if start is not None:
+            POOL_CHECKOUT_SECONDS.labels(name).observe(perf_counter() - start)
+            _checkout_started.set(None)
+
+    return on_checkout
+
+
+class _PoolStateCollector(Collector):
+    """Reads checked-out and overflow counts from each pool at scrape time."""
+
+    def __init__(self) -> None:
+        self.engines: WeakValueDictionary[str, Engine] = WeakValueDictionary()
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        checked_out = GaugeMetricFamily(
+            "svc_catalogue_db_pool_checked_out",
+            "Connections currently checked out of the pool",
+            labels=["pool"],
+        )
+        overflow = GaugeMetricFamily(
+            "svc_catalogue_db_pool_overflow",
+            "Connections open beyond pool_size",
+            labels=["pool"],
+        )
+        for name, engine in list(self.engines.items()):
+            pool = engine.pool
+            if isinstance(pool, QueuePool):
+                checked_out.add_metric([name], pool.checkedout())
+                overflow.add_metric([name], max(pool.overflow(), 0))
+        yield checked_out
+        yield overflow
+
+
+_pool_state = _PoolStateCollector()
+REGISTRY.register(_pool_state)
+
+
+def instrument_pool(engine: Engine, name: str) -> None:
+    """Export ``engine``'s pool state and checkout waits labelled ``name``."""
+    _pool_state.engines[name] = engine
+    if engine.pool not in _pool_names:
+        _pool_names[engine.pool] = name
+        event.listen(engine.pool, "checkout", _checkout_listener(name))
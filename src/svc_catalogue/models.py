@@ -3,10 +3,10 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from uuid import UUID, uuid4
 
-from sqlalchemy import JSON, Column, DateTime
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Index, Integer
 from sqlalchemy.sql import func
 from sqlmodel import Field, SQLModel
 
@@ -16,8 +16,8 @@ class Service(SQLModel, table=True):
 
     id: UUID = Field(default_factory=uuid4, primary_key=True, index=True)
     name: str = Field(index=True, unique=True, min_length=1, max_length=255)
-    owner_team: str = Field(index=True, min_length=1, max_length=255)
-    tier: str = Field(index=True)
+    owner_team: str = Field(min_length=1, max_length=255)
+    tier: str
     lifecycle: str = Field(index=True)
     endpoints: List[str] = Field(
         default_factory=list, sa_column=Column(JSON, nullable=False)
@@ -25,6 +25,8 @@ class Service(SQLModel, table=True):
     tags: List[str] = Field(
         default_factory=list, sa_column=Column(JSON, nullable=False)
     )
+    content_hash: Optional[str] = Field(default=None, max_length=64)
+    search_text: str = Field(default="")
     created_at: datetime = Field(
         default_factory=datetime.utcnow,
         sa_column=Column(DateTime(timezone=True), default=func.now(), nullable=False),
@@ -38,3 +40,97 @@ class Service(SQLModel, table=True):
             nullable=False,
         ),
     )
+
+
+# Lookups compare lower(name) / lower(owner_team), so the indexes must be on the
+# same expressions; the composites cover the common filter combinations.
+Index("ix_service_name_lower", func.lower(Service.name))
+Index(
+    "ix_service_owner_team_lower_lifecycle",
+    func.lower(Service.owner_team),
+    Service.lifecycle,
+)
+Index("ix_service_tier_lifecycle", Service.tier, Service.lifecycle)
+
+
+class ServiceTag(SQLModel, table=True):
+    """Tag assignment kept in sync with ``Service.tags`` for indexed tag filters."""
+
+    __tablename__ = "service_tag"
+
+    tag: str = Field(primary_key=True, max_length=50)
+    service_id: UUID = Field(primary_key=True, foreign_key="service.id", index=True)
+
+
+class ServiceEndpoint(SQLModel, table=True):
+    """Endpoint URL of a service split into indexed parts for reverse lookups."""
+
+    __tablename__ = "service_endpoint"
+
+    service_id: UUID = Field(primary_key=True, foreign_key="service.id", index=True)
+    url: str = Field(primary_key=True)
+    scheme: str = Field(max_length=10)
+    host: str = Field(max_length=255)
+    port: int
+    # Without a trailing slash, except for the root path "/".
+    path: str
+    # Outcome of the latest reachability probe (see ``prober``).
+    last_status: Optional[int] = None
+    last_latency_ms: Optional[float] = None
+    last_error: Optional[str] = Field(default=None, max_length=255)
+    last_probed_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
+
+
+# Host lookups use the leading column; URL lookups add port and path prefixes.
+Index(
+    "ix_service_endpoint_host_port_path",
+    ServiceEndpoint.host,
+    ServiceEndpoint.port,
+    ServiceEndpoint.path,
+)
+
+
+class TagCount(SQLModel, table=True):
+    """Number of services carrying each tag, adjusted by every write path."""
+
+    __tablename__ = "tag_count"
+
+    tag: str = Field(primary_key=True, max_length=50)
+    count: int
+
+
+# Prefix matches compile to LIKE 'prefix%', which PostgreSQL can only answer
+# from a pattern-ops index under a non-C collation; SQLite uses the primary key.
+Index(
+    "ix_tag_count_tag_pattern",
+    TagCount.tag,
+    postgresql_ops={"tag": "text_pattern_ops"},
+).ddl_if(dialect="postgresql")
+# Serves the unfiltered "most used tags" listing in its sort order.
+Index("ix_tag_count_count_tag", TagCount.count.desc(), TagCount.tag)
+
+
+class ServiceChange(SQLModel, table=True):
+    """Append-only change log behind the change feed; deletes leave tombstones."""
+
+    __tablename__ = "service_change"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq: Optional[int] = Field(
+        default=None,
+        sa_column=Column(
+            BigInteger().with_variant(Integer, "sqlite"),
+            primary_key=True,
+            autoincrement=True,
+        ),
+    )
+    service_id: UUID = Field(index=True)
+    name: str = Field(max_length=255)
+    op: str = Field(max_length=10)
+    changed_at: datetime = Field(
+        sa_column=Column(
+            DateTime(timezone=True), server_default=func.now(), nullable=False
+        ),
+    )
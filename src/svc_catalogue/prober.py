@@ -0,0 +1,254 @@
+"""Concurrent reachability probes for registered service endpoints.
+
+:class:`EndpointProber` sends one ``GET`` per endpoint from a shared
+``httpx.AsyncClient`` (so connections to a host are reused). A fixed pool of
+``probe_concurrency`` workers takes targets from a queue that releases at
+most ``probe_per_host_concurrency`` of a host's targets at a time; workers
+start at random offsets within ``probe_jitter_seconds``. :func:`run_probe_round`
+probes every row of ``service_endpoint`` and stores the outcome on it;
+:class:`ProbeScheduler` repeats rounds in the background of the API process,
+and ``scripts/probe_endpoints.py`` runs them from the command line.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any, Optional, Sequence
+from uuid import UUID
+
+import httpx
+from prometheus_client import Counter, Gauge, Histogram
+
+from .config import settings
+from .crud import list_probe_targets, record_probe_results
+from .db import get_session
+
+logger = logging.getLogger(__name__)
+
+PROBES = Counter(
+    "svc_catalogue_endpoint_probes",
+    "Endpoint probes by outcome (up, down, timeout, error)",
+    ["outcome"],
+)
+PROBE_SECONDS = Histogram(
+    "svc_catalogue_endpoint_probe_seconds",
+    "Time until an endpoint answered with response headers",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+ENDPOINTS = Gauge(
+    "svc_catalogue_endpoints",
+    "Endpoints by outcome of the latest probe round",
+    ["outcome"],
+)
+OUTCOMES = ("up", "down", "timeout", "error")
+
+
+@dataclass(slots=True)
+class ProbeTarget:
+    service_id: UUID
+    service_name: str
+    url: str
+    host: str
+
+
+@dataclass(slots=True)
+class ProbeResult:
+    target: ProbeTarget
+    status: Optional[int]
+    latency_seconds: Optional[float]
+    error: Optional[str]
+    probed_at: datetime
+
+    @property
+    def outcome(self) -> str:
+        if self.status is not None:
+            return "up" if self.status < 500 else "down"
+        return "timeout" if self.error == "timeout" else "error"
+
+    def values(self) -> dict[str, Any]:
+        """Column values for :func:`crud.record_probe_results`."""
+        return {
+            "service_id": self.target.service_id,
+            "url": self.target.url,
+            "last_status": self.status,
+            "last_latency_ms": (
+                None if self.latency_seconds is None else self.latency_seconds * 1000
+            ),
+            "last_error": self.error,
+            "last_probed_at": self.probed_at,
+        }
+
+
+class EndpointProber:
+    """Probe endpoints concurrently within global and per-host limits."""
+
+    def __init__(
+        self,
+        *,
+        concurrency: Optional[int] = None,
+        per_host_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        jitter_seconds: Optional[float] = None,
+        max_body_bytes: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.concurrency = concurrency or settings.probe_concurrency
+        self.per_host_concurrency = (
+            per_host_concurrency or settings.probe_per_host_concurrency
+        )
+        self.timeout = (
+            timeout if timeout is not None else settings.probe_timeout_seconds
+        )
+        self.jitter_seconds = (
+            jitter_seconds
+            if jitter_seconds is not None
+            else settings.probe_jitter_seconds
+        )
+        self.max_body_bytes = (
+            max_body_bytes
+            if max_body_bytes is not None
+            else settings.probe_max_body_bytes
+        )
+        self.transport = transport
+
+    async def probe_all(self, targets: Sequence[ProbeTarget]) -> list[ProbeResult]:
+        """Probe every target once; results keep the order of ``targets``."""
+        pending: defaultdict[str, deque[int]] = defaultdict(deque)
+        for index, target in enumerate(targets):
+            pending[target.host].append(index)
+        # Each queued host is a slot for one probe of that host; a worker
+        # puts it back after the probe and drops it once the host is done.
+        ready: asyncio.Queue[str] = asyncio.Queue()
+        for host, indexes in pending.items():
+            for _ in range(min(self.per_host_concurrency, len(indexes))):
+                ready.put_nowait(host)
+        results: list[Optional[ProbeResult]] = [None] * len(targets)
+        limits = httpx.Limits(
+            max_connections=self.concurrency,
+            max_keepalive_connections=self.concurrency,
+        )
+
+        async def worker(client: httpx.AsyncClient) -> None:
+            if self.jitter_seconds > 0:
+                await asyncio.sleep(random.uniform(0, self.jitter_seconds))
+            # Slots are never added, so an empty queue means the remaining
+            # ones are held by running workers.
+            while not ready.empty():
+                host = ready.get_nowait()
+                if not pending[host]:
+                    continue
+                index = pending[host].popleft()
+                results[index] = await self._probe(client, targets[index])
+                ready.put_nowait(host)
+
+        async with httpx.AsyncClient(
+            timeout=self.timeout, limits=limits, transport=self.transport
+        ) as client:
+            workers = min(self.concurrency, ready.qsize())
+            await asyncio.gather(*(worker(client) for _ in range(workers)))
+        return [result for result in results if result is not None]
+
+    async def _probe(
+        self, client: httpx.AsyncClient, target: ProbeTarget
+    ) -> ProbeResult:
+        status = latency = error = None
+        probed_at = datetime.now(timezone.utc)
+        start = perf_counter()
+        try:
+            async with client.stream("GET", target.url) as response:
+                latency = perf_counter() - start
+                status = response.status_code
+                # Read small bodies so the connection goes back to the pool;
+                # larger ones are cut off and their connection is closed.
+                received = 0
+                async for chunk in response.aiter_raw():
+                    received += len(chunk)
+                    if received > self.max_body_bytes:
+                        break
+        except httpx.TimeoutException:
+            error = "timeout"
+        except httpx.HTTPError as exc:
+            error = (str(exc) or type(exc).__name__)[:255]
+        return ProbeResult(target, status, latency, error, probed_at)
+
+
+def _load_targets() -> list[ProbeTarget]:
+    with get_session() as session:
+        return [
+            ProbeTarget(row.service_id, row.service_name, row.url, row.host)
+            for row in list_probe_targets(session)
+        ]
+
+
+def _store_results(results: Sequence[ProbeResult]) -> None:
+    with get_session() as session:
+        record_probe_results(session, [result.values() for result in results])
+
+
+def _export_metrics(results: Sequence[ProbeResult]) -> None:
+    counts = dict.fromkeys(OUTCOMES, 0)
+    for result in results:
+        counts[result.outcome] += 1
+        PROBES.labels(result.outcome).inc()
+        if result.latency_seconds is not None:
+            PROBE_SECONDS.observe(result.latency_seconds)
+    for outcome, count in counts.items():
+        ENDPOINTS.labels(outcome).set(count)
+
+
+async def run_probe_round(prober: Optional[EndpointProber] = None) -> list[ProbeResult]:
+    """Probe every registered endpoint once and store the results."""
+    prober = prober or EndpointProber()
+    targets = await asyncio.to_thread(_load_targets)
+    results = await prober.probe_all(targets)
+    await asyncio.to_thread(_store_results, results)
+    _export_metrics(results)
+    return results
+
+
+class ProbeScheduler:
+    """Run probe rounds every ``probe_interval_seconds`` on the event loop."""
+
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task[None]] = None
+
+    def start(self, interval: Optional[float] = None) -> bool:
+        """Start the loop unless disabled (interval <= 0) or already running."""
+        interval = settings.probe_interval_seconds if interval is None else interval
+        if interval <= 0 or self._task is not None:
+            return False
+        self._task = asyncio.get_running_loop().create_task(self._run(interval))
+        return True
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            started = perf_counter()
+            try:
+                results = await run_probe_round()
+                logger.info(
+                    "Probed %d endpoints in %.1fs",
+                    len(results),
+                    perf_counter() - started,
+                )
+            except Exception:
+                logger.exception("Endpoint probe round failed")
+            await asyncio.sleep(max(0.0, interval - (perf_counter() - started)))
+
+
+probe_scheduler = ProbeScheduler()
@@ -0,0 +1,381 @@
+"""In-process read model answering service list queries from memory.
+
+A :class:`CatalogueReadModel` holds every service as a compact
+:class:`ServiceEntry`, looked up by id and name, plus indexes on
+lower(owner_team), tier, lifecycle, tag and the trigrams of ``search_text``.
+Every index bucket, like the full ``_order``, is a list of ``(name, id)`` keys
+in pagination order, so filtered pages are produced by walking the smallest
+bucket from the cursor and stopping once the page is full. It is loaded once and then kept
+current from the ``service_change`` feed: each worker tracks the last
+sequence number it applied and fetches newer entries when its snapshot is
+older than ``read_model_refresh_seconds`` or this process committed a write.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import math
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import Any, Iterable, Iterator, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlmodel import Session
+
+from .cache import on_services_committed
+from .config import settings
+from .crud import ServiceFilter, ServiceNotFoundError, iter_services, list_changes
+from .models import ServiceChange
+from .schemas import CountMode
+from .search import search_document, word_similarity
+
+_FEED_PAGE = 1000
+
+Key = tuple[str, str]
+# Keys matching any of the buckets; a query's clauses must all match.
+Clause = list[list[Key]]
+
+
+@dataclass(slots=True)
+class ServiceEntry:
+    """Attributes of one service, shaped like a ``crud`` read row."""
+
+    id: UUID
+    name: str
+    owner_team: str
+    tier: str
+    lifecycle: str
+    endpoints: list[str]
+    tags: list[str]
+    created_at: datetime
+    updated_at: datetime
+    content_hash: Optional[str]
+    search_text: str
+
+    @classmethod
+    def from_row(cls, row: Any) -> ServiceEntry:
+        return cls(
+            id=row.id,
+            name=row.name,
+            owner_team=row.owner_team,
+            tier=row.tier,
+            lifecycle=row.lifecycle,
+            endpoints=list(row.endpoints or []),
+            tags=list(row.tags or []),
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+            content_hash=row.content_hash,
+            search_text=search_document(row.name, row.tags or []),
+        )
+
+    @property
+    def key(self) -> Key:
+        return (self.name, str(self.id))
+
+
+def _grams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _query_grams(query: str) -> set[str]:
+    # Per word, like the FTS5 MATCH expression built by the SQLite backend.
+    return set().union(*(_grams(word) for word in query.split()))
+
+
+def _contains(keys: list[Key], key: Key) -> bool:
+    position = bisect.bisect_left(keys, key)
+    return position < len(keys) and keys[position] == key
+
+
+def _matches(key: Key, clauses: Sequence[Clause]) -> bool:
+    return all(any(_contains(keys, key) for keys in clause) for clause in clauses)
+
+
+def _scan(clause: Clause, after: Optional[Key]) -> Iterator[Key]:
+    """Keys of ``clause`` after ``after`` in order, without duplicates."""
+    runs = [
+        islice(keys, 0 if after is None else bisect.bisect_right(keys, after), None)
+        for keys in clause
+    ]
+    if len(runs) == 1:
+        yield from runs[0]
+        return
+    previous = None
+    for key in heapq.merge(*runs):
+        if key != previous:
+            yield key
+            previous = key
+
+
+def _size(clause: Clause) -> int:
+    return sum(len(keys) for keys in clause)
+
+
+class CatalogueReadModel:
+    """Snapshot of the catalogue with secondary indexes; thread-safe."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._reset()
+
+    def reset(self) -> None:
+        """Drop the snapshot; the next refresh reloads it."""
+        with self._lock:
+            self._reset()
+
+    def _reset(self) -> None:
+        self.loaded = False
+        self.high_water = 0
+        self.refreshed_at = 0.0
+        self.dirty = False
+        self._by_id: dict[UUID, ServiceEntry] = {}
+        # Names are unique (exact match), so they map ``_order`` keys to ids.
+        self._by_name: dict[str, UUID] = {}
+        self._order: list[Key] = []
+        self._indexes: dict[str, dict[str, list[Key]]] = {
+            "owner_team": {},
+            "tier": {},
+            "lifecycle": {},
+            "tag": {},
+            "gram": {},
+        }
+
+    # -- maintenance -----------------------------------------------------
+
+    def _index_keys(self, entry: ServiceEntry) -> Iterable[tuple[str, str]]:
+        yield "owner_team", entry.owner_team.lower()
+        yield "tier", entry.tier
+        yield "lifecycle", entry.lifecycle
+        for tag in set(entry.tags):
+            yield "tag", tag
+        for gram in _grams(entry.search_text):
+            yield "gram", gram
+
+    def _remove(self, service_id: UUID) -> None:
+        entry = self._by_id.pop(service_id, None)
+        if entry is None:
+            return
+        self._by_name.pop(entry.name, None)
+        key = entry.key
+        for keys in self._buckets(entry):
+            position = bisect.bisect_left(keys, key)
+            if position < len(keys) and keys[position] == key:
+                del keys[position]
+        for index, value in self._index_keys(entry):
+            if not self._indexes[index].get(value, True):
+                del self._indexes[index][value]
+
+    def _add(self, entry: ServiceEntry) -> None:
+        self._remove(entry.id)
+        self._by_id[entry.id] = entry
+        self._by_name[entry.name] = entry.id
+        # One key tuple shared by ``_order`` and every bucket of the entry.
+        key = entry.key
+        bisect.insort(self._order, key)
+        for index, value in self._index_keys(entry):
+            bisect.insort(self._indexes[index].setdefault(value, []), key)
+
+    def _buckets(self, entry: ServiceEntry) -> Iterator[list[Key]]:
+        yield self._order
+        for index, value in self._index_keys(entry):
+            keys = self._indexes[index].get(value)
+            if keys is not None:
+                yield keys
+
+    def load(self, session: Session) -> None:
+        """Replace the snapshot with every service, from one transaction."""
+        high_water = session.execute(select(func.max(ServiceChange.seq))).scalar()
+        entries = [ServiceEntry.from_row(row) for row in iter_services(session)]
+        with self._lock:
+            self._reset()
+            for entry in entries:
+                self._add(entry)
+            self.high_water = high_water or 0
+            self.refreshed_at = time.monotonic()
+            self.loaded = True
+
+    def apply_changes(self, session: Session) -> int:
+        """Apply feed entries after the high-water mark; returns how many."""
+        applied = 0
+        while True:
+            rows = list_changes(session, self.high_water, _FEED_PAGE)
+            with self._lock:
+                for row in rows:
+                    if row.id is None or row.op == "deleted":
+                        self._remove(row.service_id)
+                    else:
+                        self._add(ServiceEntry.from_row(row))
+                    self.high_water = row.seq
+            applied += len(rows)
+            if len(rows) < _FEED_PAGE:
+                break
+        self.refreshed_at = time.monotonic()
+        return applied
+
+    def needs_refresh(self) -> bool:
+        """Whether the snapshot is missing, older than the refresh interval or
+        behind a write committed by this process."""
+        age = time.monotonic() - self.refreshed_at
+        return (
+            not self.loaded or self.dirty or age >= settings.read_model_refresh_seconds
+        )
+
+    def refresh(self, session: Session, *, force: bool = False) -> None:
+        """Load or catch up if needed; concurrent callers serve the snapshot."""
+        if not (force or self.needs_refresh()):
+            return
+        blocking = not self.loaded
+        if not self._refresh_lock.acquire(blocking=blocking):
+            return
+        try:
+            self.dirty = False
+            if not self.loaded:
+                self.load(session)
+            else:
+                self.apply_changes(session)
+        finally:
+            self._refresh_lock.release()
+
+    def mark_dirty(self) -> None:
+        self.dirty = True
+
+    # -- queries ---------------------------------------------------------
+
+    def get(self, service_id: UUID) -> ServiceEntry:
+        entry = self._by_id.get(service_id)
+        if entry is None:
+            raise ServiceNotFoundError("Service not found")
+        return entry
+
+    def _entry(self, key: Key) -> ServiceEntry:
+        return self._by_id[self._by_name[key[0]]]
+
+    def _clauses(self, filters: ServiceFilter) -> list[Clause]:
+        """Buckets of the indexed filters other than search, smallest first;
+        no clauses means every service."""
+        indexes = self._indexes
+        clauses: list[Clause] = []
+        if filters.owner_team:
+            clauses.append([indexes["owner_team"].get(filters.owner_team, [])])
+        if filters.tier:
+            clauses.append([indexes["tier"].get(filters.tier, [])])
+        if filters.lifecycle:
+            clauses.append([indexes["lifecycle"].get(filters.lifecycle, [])])
+        for tag in filters.all_tags:
+            clauses.append([indexes["tag"].get(tag, [])])
+        if filters.any_tags:
+            clauses.append([indexes["tag"].get(tag, []) for tag in filters.any_tags])
+        clauses.sort(key=_size)
+        return clauses
+
+    def _walk(self, clauses: Sequence[Clause], after: Optional[Key]) -> Iterator[Key]:
+        """Keys passing every clause after ``after``, in ``(name, id)`` order."""
+        if not clauses:
+            return _scan([self._order], after)
+        return (key for key in _scan(clauses[0], after) if _matches(key, clauses[1:]))
+
+    def _estimate(self, clauses: Sequence[Clause]) -> int:
+        # Assumes independent filters, like a planner without statistics.
+        total = len(self._order)
+        if not total:
+            return 0
+        fraction = math.prod(min(_size(clause), total) / total for clause in clauses)
+        return round(total * fraction)
+
+    def _search_ranked(
+        self, query: str, clauses: Sequence[Clause]
+    ) -> list[tuple[float, ServiceEntry]]:
+        limit = settings.read_model_search_candidates
+        grams = _query_grams(query)
+        if not grams:
+            # Too short for trigrams: plain substring match in name order.
+            found = (
+                (1.0, self._entry(key))
+                for key in self._walk(clauses, None)
+                if query in self._entry(key).search_text
+            )
+            return list(islice(found, limit))
+        # Score only the ``limit`` candidates sharing the most query trigrams.
+        shared: Counter[Key] = Counter()
+        for gram in grams:
+            shared.update(self._indexes["gram"].get(gram, ()))
+        shortlist = heapq.nsmallest(
+            limit,
+            (key for key in shared if _matches(key, clauses)),
+            key=lambda key: (-shared[key], key),
+        )
+        threshold = settings.search_similarity_threshold
+        ranked = []
+        for key in shortlist:
+            entry = self._entry(key)
+            score = word_similarity(query, entry.search_text)
+            if score >= threshold:
+                ranked.append((score, entry))
+        ranked.sort(key=lambda item: (-item[0], item[1].key))
+        return ranked
+
+    def list_services(
+        self,
+        *,
+        owner_team: Optional[str] = None,
+        tier: Optional[str] = None,
+        lifecycle: Optional[str] = None,
+        search: Optional[str] = None,
+        all_tags: Iterable[str] = (),
+        any_tags: Iterable[str] = (),
+        after: Optional[Tuple[str, UUID]] = None,
+        offset: int = 0,
+        limit: int = 100,
+        count: CountMode = CountMode.exact,
+    ) -> Tuple[Sequence[ServiceEntry], Optional[int]]:
+        """In-memory equivalent of :func:`crud.list_services`.
+
+        Pages stop reading the indexes once ``offset + limit`` services
+        matched; an exact total walks the rest without building a list, and
+        ``estimate`` multiplies the selectivity of each filter. Search uses
+        the trigram similarity of the SQLite backend over at most
+        ``read_model_search_candidates`` candidates.
+        """
+        filters = ServiceFilter.build(
+            owner_team=owner_team,
+            tier=tier,
+            lifecycle=lifecycle,
+            search=search,
+            all_tags=all_tags,
+            any_tags=any_tags,
+        )
+        total: Optional[int] = None
+        with self._lock:
+            clauses = self._clauses(filters)
+            if filters.search:
+                if after is not None:
+                    raise ValueError(
+                        "Keyset pagination is not supported for ranked search"
+                    )
+                ranked = self._search_ranked(filters.search, clauses)
+                total = len(ranked)
+                page = [entry for _, entry in ranked[offset : offset + limit]]
+            else:
+                after_key = None if after is None else (after[0], str(after[1]))
+                keys = islice(self._walk(clauses, after_key), offset, offset + limit)
+                page = [self._entry(key) for key in keys]
+                if count is CountMode.estimate:
+                    total = self._estimate(clauses)
+                elif count is CountMode.exact:
+                    total = (
+                        _size(clauses[0])
+                        if len(clauses) == 1 and len(clauses[0]) == 1
+                        else sum(1 for _ in self._walk(clauses, None))
+                    )
+        return page, (None if count is CountMode.none else total)
+
+
+catalogue = CatalogueReadModel()
+on_services_committed(catalogue.mark_dirty)
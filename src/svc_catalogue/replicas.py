@@ -0,0 +1,100 @@
+"""Read-replica selection with health-based ejection."""
+
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Literal, Optional, Sequence
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+ReadRouting = Literal["round_robin", "least_connections"]
+
+
+@dataclass
+class Replica:
+    """One read replica; the async engine is created on first use."""
+
+    name: str
+    engine: Engine
+    async_factory: Callable[[], AsyncEngine]
+    ejected_until: float = 0.0
+    checked_at: float = 0.0
+    checking: bool = False
+    _async_engine: Optional[AsyncEngine] = None
+
+    def async_engine(self) -> AsyncEngine:
+        if self._async_engine is None:
+            self._async_engine = self.async_factory()
+        return self._async_engine
+
+    def in_use(self, is_async: bool) -> int:
+        """Connections currently checked out of the pool serving requests."""
+        engine = self.engine
+        if is_async:
+            if self._async_engine is None:
+                return 0
+            engine = self._async_engine.sync_engine
+        pool = engine.pool
+        return pool.checkedout() if isinstance(pool, QueuePool) else 0
+
+
+class ReplicaRouter:
+    """Orders healthy replicas for the next read.
+
+    ``round_robin`` rotates the starting replica per call; ``least_connections``
+    prefers the replica with the fewest checked-out connections. A replica
+    that fails its connection check is ejected for ``eject_seconds`` and then
+    tried again; with every replica ejected, reads go to the primary.
+    Failures are reported by background health checks and by reads that
+    lose their replica connection (see ``db.get_read_session``).
+    """
+
+    def __init__(
+        self,
+        replicas: Sequence[Replica],
+        routing: ReadRouting = "round_robin",
+        eject_seconds: float = 30.0,
+    ) -> None:
+        self.replicas = list(replicas)
+        self.routing = routing
+        self.eject_seconds = eject_seconds
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def candidates(self, *, is_async: bool = False) -> list[Replica]:
+        now = time.monotonic()
+        healthy = [r for r in self.replicas if r.ejected_until <= now]
+        if not healthy:
+            return []
+        if self.routing == "least_connections":
+            return sorted(healthy, key=lambda replica: replica.in_use(is_async))
+        with self._lock:
+            start = next(self._counter) % len(healthy)
+        return healthy[start:] + healthy[:start]
+
+    def eject(self, replica: Replica) -> None:
+        replica.ejected_until = time.monotonic() + self.eject_seconds
+
+    def due_for_check(self, interval: float) -> list[Replica]:
+        """Replicas whose last health check is older than ``interval``; they
+        are marked as being checked."""
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            for replica in self.replicas:
+                if not replica.checking and now - replica.checked_at >= interval:
+                    replica.checking = True
+                    due.append(replica)
+        return due
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            if replica._async_engine is not None:
+                await replica._async_engine.dispose()
+                replica._async_engine = None
+            replica.engine.dispose()
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Annotated, List, Literal, Optional, Union
 from uuid import UUID, uuid4
 
 from pydantic import BaseModel, Field, HttpUrl, constr, field_validator
@@ -24,6 +24,17 @@ class ServiceLifecycle(str, Enum):
     deprecated = "deprecated"
 
 
+class CountMode(str, Enum):
+    exact = "exact"
+    estimate = "estimate"
+    none = "none"
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
 class ServiceBase(BaseModel):
     name: constr(min_length=1, max_length=255)
     owner_team: constr(min_length=1, max_length=255)
@@ -67,11 +78,197 @@ class ServiceRead(ServiceBase):
 
 class ServiceList(BaseModel):
     items: List[ServiceRead]
-    total: int
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+# Sparse fieldsets (``fields=``) always carry ``id`` and ``name``; any other
+# field is only present when it was selected.
+class ServiceReadPartial(BaseModel):
+    id: UUID
+    name: str
+    owner_team: Optional[str] = None
+    tier: Optional[ServiceTier] = None
+    lifecycle: Optional[ServiceLifecycle] = None
+    endpoints: Optional[List[HttpUrl]] = None
+    tags: Optional[List[str]] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class ServiceListPartial(BaseModel):
+    items: List[ServiceReadPartial]
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+class EndpointStatus(BaseModel):
+    url: str
+    scheme: str
+    host: str
+    port: int
+    path: str
+    last_status: Optional[int] = None
+    last_latency_ms: Optional[float] = None
+    last_error: Optional[str] = None
+    last_probed_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class EndpointMatch(BaseModel):
+    endpoint: str
+    service: ServiceRead
+
+
+class EndpointLookupResult(BaseModel):
+    items: List[EndpointMatch]
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class ServiceFacets(BaseModel):
+    tier: List[FacetCount]
+    lifecycle: List[FacetCount]
+    owner_team: List[FacetCount]
+    tags: List[FacetCount]
+
+
+class TagRead(BaseModel):
+    tag: str
+    count: int
+
+
+class TagList(BaseModel):
+    items: List[TagRead]
+
+
+class ChangeOp(str, Enum):
+    created = "created"
+    updated = "updated"
+    deleted = "deleted"
+
+
+class ServiceChangeRead(BaseModel):
+    seq: int
+    op: ChangeOp
+    id: UUID
+    name: str
+    changed_at: datetime
+    service: Optional[ServiceRead] = None
+
+
+class ServiceChangeList(BaseModel):
+    changes: List[ServiceChangeRead]
+    next_cursor: int
+
+
+class ServiceLookup(BaseModel):
+    ids: List[UUID] = Field(default_factory=list)
+    names: List[str] = Field(default_factory=list)
+
+
+class ServiceLookupResult(BaseModel):
+    items: List[ServiceRead]
+    missing_ids: List[UUID] = Field(default_factory=list)
+    missing_names: List[str] = Field(default_factory=list)
+
+
+class ServiceLookupResultPartial(BaseModel):
+    items: List[ServiceReadPartial]
+    missing_ids: List[UUID] = Field(default_factory=list)
+    missing_names: List[str] = Field(default_factory=list)
+
+
+class BatchMode(str, Enum):
+    atomic = "atomic"
+    best_effort = "best_effort"
+
+
+class BatchCreate(BaseModel):
+    op: Literal["create"]
+    service: ServiceCreate
+
+
+class BatchUpdate(BaseModel):
+    op: Literal["update"]
+    id: UUID
+    changes: ServiceUpdate
+
+
+class BatchDelete(BaseModel):
+    op: Literal["delete"]
+    id: UUID
+
+
+BatchOperation = Annotated[
+    Union[BatchCreate, BatchUpdate, BatchDelete], Field(discriminator="op")
+]
+
+
+class ServiceBatch(BaseModel):
+    mode: BatchMode = BatchMode.atomic
+    operations: List[BatchOperation] = Field(min_length=1)
+
+
+class BatchOperationResult(BaseModel):
+    index: int
+    op: str
+    status: int
+    id: Optional[UUID] = None
+    error: Optional[str] = None
+
+
+class ServiceBatchResult(BaseModel):
+    committed: bool
+    results: List[BatchOperationResult]
+
+
+class CSVImportChunk(BaseModel):
+    index: int
+    first_row: int
+    last_row: int
+    created: int
+    updated: int
+    unchanged: int = 0
+    committed: bool
+
+
+class CSVImportDiff(BaseModel):
+    created: List[str] = Field(default_factory=list)
+    updated: List[str] = Field(default_factory=list)
+    unchanged: List[str] = Field(default_factory=list)
 
 
 class CSVImportResult(BaseModel):
     created: int
     updated: int
+    unchanged: int = 0
     errors: List[str] = Field(default_factory=list)
     total_rows: int
+    chunks: Optional[List[CSVImportChunk]] = None
+    diff: Optional[CSVImportDiff] = None
+
+
+class ImportJobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+class ImportJobRead(BaseModel):
+    id: UUID
+    status: ImportJobStatus
+    rows_processed: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    errors: List[str] = Field(default_factory=list)
+    detail: Optional[str] = None
+    submitted_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
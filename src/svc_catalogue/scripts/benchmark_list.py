@@ -0,0 +1,112 @@
+"""Benchmark rendering a ``limit=100`` service page.
+
+Compares the ORM + ``ServiceRead`` + response-model path the list endpoint
+used to take with the row + orjson path it takes now, against a scratch
+SQLite database seeded with ``--services`` rows.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import time
+from typing import Callable
+
+
+def _seed(count: int) -> None:
+    from svc_catalogue.crud import bulk_upsert_services, service_values
+    from svc_catalogue.db import get_session, init_db
+    from svc_catalogue.schemas import ServiceCreate
+
+    init_db()
+    rows = [
+        service_values(
+            ServiceCreate(
+                name=f"service-{index:06d}",
+                owner_team=f"Team {index % 20}",
+                tier=["gold", "silver", "bronze"][index % 3],
+                lifecycle=["production", "preprod", "dev"][index % 3],
+                endpoints=[
+                    f"https://svc-{index}.example.com/api",
+                    f"https://svc-{index}.example.com/health",
+                ],
+                tags=[f"team-{index % 20}", f"domain-{index % 7}", "shared"],
+            )
+        )
+        for index in range(count)
+    ]
+    with get_session() as session:
+        bulk_upsert_services(session, rows)
+
+
+def _model_page(limit: int) -> bytes:
+    from pydantic import TypeAdapter
+    from sqlmodel import select
+
+    from svc_catalogue.db import get_session
+    from svc_catalogue.models import Service
+    from svc_catalogue.schemas import ServiceList, ServiceRead
+
+    adapter = TypeAdapter(ServiceList)
+    with get_session() as session:
+        statement = select(Service).order_by(Service.name, Service.id).limit(limit)
+        services = session.exec(statement).all()
+        result = ServiceList(
+            items=[
+                ServiceRead.model_validate(service, from_attributes=True)
+                for service in services
+            ],
+            total=None,
+        )
+        # FastAPI re-validates the returned model against ``response_model``.
+        validated = adapter.validate_python(result.model_dump())
+        content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, separators=(",", ":")).encode("utf-8")
+
+
+def _fast_page(limit: int) -> bytes:
+    from svc_catalogue.api.responses import ServiceJSONResponse, service_list_payload
+    from svc_catalogue.crud import list_services
+    from svc_catalogue.db import get_session
+    from svc_catalogue.schemas import CountMode
+
+    with get_session() as session:
+        rows, total = list_services(session, limit=limit, count=CountMode.none)
+        return ServiceJSONResponse(service_list_payload(rows, total, None)).body
+
+
+def _pages_per_second(
+    render: Callable[[int], bytes], limit: int, seconds: float
+) -> float:
+    render(limit)
+    pages = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < seconds:
+        render(limit)
+        pages += 1
+    return pages / elapsed
+
+
+def run(services: int = 2000, limit: int = 100, seconds: float = 3.0) -> float:
+    """Seed a scratch database and return the fast path's speed-up factor."""
+    _seed(services)
+    baseline = _pages_per_second(_model_page, limit, seconds)
+    fast = _pages_per_second(_fast_page, limit, seconds)
+    print(f"model path : {baseline:8.1f} pages/s")
+    print(f"fast path  : {fast:8.1f} pages/s")
+    print(f"speed-up   : {fast / baseline:8.2f}x")
+    return fast / baseline
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entrypoint
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark service list rendering")
+    parser.add_argument("--services", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+    scratch = tempfile.mkdtemp(prefix="svc-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite+pysqlite:///{scratch}/bench.db"
+    run(args.services, args.limit, args.seconds)
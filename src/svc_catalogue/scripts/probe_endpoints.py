@@ -0,0 +1,57 @@
+"""Probe every registered endpoint and store the results.
+
+Runs one round by default; ``--interval`` keeps probing, which is the
+command-line counterpart of ``PROBE_INTERVAL_SECONDS`` in the API process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from typing import Optional
+
+from svc_catalogue.db import init_db
+from svc_catalogue.prober import EndpointProber, run_probe_round
+
+
+async def probe(
+    interval: Optional[float], prober: EndpointProber
+) -> None:  # pragma: no cover - CLI loop
+    while True:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        results = await run_probe_round(prober)
+        outcomes = Counter(result.outcome for result in results)
+        summary = ", ".join(f"{n} {outcome}" for outcome, n in sorted(outcomes.items()))
+        print(f"Probed {len(results)} endpoints: {summary or 'none registered'}")
+        if interval is None:
+            return
+        await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entrypoint
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Probe registered endpoints")
+    parser.add_argument(
+        "--interval", type=float, help="Seconds between rounds (default: run once)"
+    )
+    parser.add_argument("--concurrency", type=int, help="Probes in flight")
+    parser.add_argument("--per-host", type=int, help="Probes in flight per host")
+    parser.add_argument("--timeout", type=float, help="Per-probe timeout in seconds")
+    parser.add_argument(
+        "--jitter", type=float, help="Spread probe starts over this many seconds"
+    )
+    args = parser.parse_args()
+    init_db()
+    asyncio.run(
+        probe(
+            args.interval,
+            EndpointProber(
+                concurrency=args.concurrency,
+                per_host_concurrency=args.per_host,
+                timeout=args.timeout,
+                jitter_seconds=args.jitter,
+            ),
+        )
+    )
@@ -0,0 +1,207 @@
+"""Pluggable backends for the free-text ``search`` filter.
+
+Every service stores a lower-cased ``search_text`` document (name and tags).
+Backends turn a query into WHERE criteria plus a relevance expression and
+install whatever index structures their dialect needs:
+
+* PostgreSQL: GIN indexes on ``to_tsvector('simple', search_text)`` and on
+  ``search_text gin_trgm_ops``; matches are full-text, substring or trigram
+  word-similarity hits, ranked by the better of ``ts_rank`` and
+  ``word_similarity``.
+* SQLite: an FTS5 trigram table kept in sync by triggers; candidates sharing
+  a trigram with the query are filtered to substring or word-similarity hits.
+* Anything else: ``LIKE '%query%'`` over ``search_text`` without ranking.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import column, event, func, literal, literal_column, or_, select, table
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.sql import ColumnElement
+
+from .config import settings
+from .models import Service
+
+logger = logging.getLogger(__name__)
+
+_SQLITE_SIMILARITY_FUNCTION = "svc_word_similarity"
+
+
+def search_document(name: str, tags: Iterable[str]) -> str:
+    """Return the text indexed for search for a service."""
+    return " ".join([name.lower(), *tags])
+
+
+def _trigrams(text: str, padded: bool = True) -> set[str]:
+    grams: set[str] = set()
+    for word in text.split():
+        padded_word = f"  {word} " if padded else word
+        grams.update(padded_word[i : i + 3] for i in range(len(padded_word) - 2))
+    return grams
+
+
+def word_similarity(query: Optional[str], document: Optional[str]) -> float:
+    """Share of the query's trigrams found in the document (1.0 for substrings).
+
+    A pure-Python approximation of ``pg_trgm.word_similarity`` used by the
+    SQLite backend.
+    """
+    if not query or not document:
+        return 0.0
+    if query in document:
+        return 1.0
+    query_grams = _trigrams(query)
+    if not query_grams:
+        return 0.0
+    return len(query_grams & _trigrams(document)) / len(query_grams)
+
+
+class SearchBackend:
+    """LIKE-based fallback; also the base class for indexed backends."""
+
+    name = "like"
+
+    def install(self, connection: Connection) -> None:
+        """Create the index structures the backend relies on."""
+
+    def criteria(self, query: str) -> ColumnElement[bool]:
+        return Service.search_text.like(f"%{query.lower()}%")
+
+    def rank(self, query: str) -> Optional[ColumnElement[Any]]:
+        """Relevance expression ordered descending, or ``None`` if unranked."""
+        return None
+
+
+class PostgresSearchBackend(SearchBackend):
+    name = "postgresql"
+
+    def install(self, connection: Connection) -> None:
+        connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        connection.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_service_search_text_trgm "
+            "ON service USING gin (search_text gin_trgm_ops)"
+        )
+        connection.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_service_search_text_tsv "
+            "ON service USING gin (to_tsvector('simple', search_text))"
+        )
+
+    @staticmethod
+    def _document() -> ColumnElement[Any]:
+        return func.to_tsvector(literal_column("'simple'"), Service.search_text)
+
+    def criteria(self, query: str) -> ColumnElement[bool]:
+        lowered = query.lower()
+        return or_(
+            self._document().bool_op("@@")(func.plainto_tsquery("simple", lowered)),
+            Service.search_text.like(f"%{lowered}%"),
+            Service.search_text.bool_op("%>")(lowered),
+        )
+
+    def rank(self, query: str) -> Optional[ColumnElement[Any]]:
+        lowered = query.lower()
+        return func.greatest(
+            func.ts_rank(self._document(), func.plainto_tsquery("simple", lowered)),
+            func.word_similarity(lowered, Service.search_text),
+        )
+
+
+class SqliteSearchBackend(SearchBackend):
+    name = "sqlite"
+
+    _fts = table("service_fts", column("rowid"), column("service_fts"))
+
+    def __init__(self) -> None:
+        self.available = False
+
+    def install(self, connection: Connection) -> None:
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE name = 'service_fts'"
+        ).first()
+        try:
+            connection.exec_driver_sql(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS service_fts USING fts5("
+                "search_text, content='service', content_rowid='rowid', "
+                "tokenize='trigram')"
+            )
+        except OperationalError:
+            logger.warning("SQLite FTS5 trigram tokenizer unavailable; using LIKE")
+            return
+        connection.exec_driver_sql(
+            "CREATE TRIGGER IF NOT EXISTS service_fts_ai AFTER INSERT ON service "
+            "BEGIN INSERT INTO service_fts(rowid, search_text) "
+            "VALUES (new.rowid, new.search_text); END"
+        )
+        connection.exec_driver_sql(
+            "CREATE TRIGGER IF NOT EXISTS service_fts_ad AFTER DELETE ON service "
+            "BEGIN INSERT INTO service_fts(service_fts, rowid, search_text) "
+            "VALUES ('delete', old.rowid, old.search_text); END"
+        )
+        connection.exec_driver_sql(
+            "CREATE TRIGGER IF NOT EXISTS service_fts_au "
+            "AFTER UPDATE OF search_text ON service "
+            "BEGIN INSERT INTO service_fts(service_fts, rowid, search_text) "
+            "VALUES ('delete', old.rowid, old.search_text); "
+            "INSERT INTO service_fts(rowid, search_text) "
+            "VALUES (new.rowid, new.search_text); END"
+        )
+        if exists is None:
+            connection.exec_driver_sql(
+                "INSERT INTO service_fts(service_fts) VALUES ('rebuild')"
+            )
+        self.available = True
+
+    def criteria(self, query: str) -> ColumnElement[bool]:
+        lowered = query.lower()
+        grams = sorted(_trigrams(lowered, padded=False))
+        if not self.available or not grams:
+            return super().criteria(query)
+        match = " OR ".join('"' + gram.replace('"', '""') + '"' for gram in grams)
+        candidates = select(self._fts.c.rowid).where(
+            self._fts.c.service_fts.bool_op("MATCH")(match)
+        )
+        return literal_column("service.rowid").in_(candidates) & or_(
+            Service.search_text.like(f"%{lowered}%"),
+            self._similarity(lowered) >= settings.search_similarity_threshold,
+        )
+
+    def rank(self, query: str) -> Optional[ColumnElement[Any]]:
+        if not self.available:
+            return None
+        return self._similarity(query.lower())
+
+    @staticmethod
+    def _similarity(query: str) -> ColumnElement[Any]:
+        return getattr(func, _SQLITE_SIMILARITY_FUNCTION)(
+            literal(query), Service.search_text
+        )
+
+
+_backends: dict[str, SearchBackend] = {
+    "postgresql": PostgresSearchBackend(),
+    "sqlite": SqliteSearchBackend(),
+}
+_fallback = SearchBackend()
+
+
+def get_search_backend(dialect_name: str) -> SearchBackend:
+    """Return the configured search backend for a dialect."""
+    if settings.search_backend == "like":
+        return _fallback
+    return _backends.get(dialect_name, _fallback)
+
+
+def configure_engine(engine: Engine) -> None:
+    """Register per-connection helpers the backends need."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _register_functions(dbapi_connection: Any, _record: Any) -> None:
+        dbapi_connection.create_function(
+            _SQLITE_SIMILARITY_FUNCTION, 2, word_similarity, deterministic=True
+        )
@@ -1,5 +1,6 @@
 import os
-from collections.abc import Iterator
+from collections.abc import Callable, Iterator
+from typing import Any, NamedTuple, Optional
 
 import pytest
 from fastapi.testclient import TestClient
@@ -8,11 +9,15 @@ os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
 os.environ.setdefault("AUTH_TOKEN", "test-token")
 os.environ.setdefault("ENVIRONMENT", "test")
 
-from sqlalchemy import delete
+from sqlalchemy import delete, event
+from sqlalchemy.engine import Engine
+from sqlmodel import SQLModel
 
+from svc_catalogue import db
+from svc_catalogue.cache import invalidate_caches
 from svc_catalogue.db import get_session, init_db
 from svc_catalogue.main import app  # noqa: E402  (import after env setup)
-from svc_catalogue.models import Service
+from svc_catalogue.read_model import catalogue
 
 
 @pytest.fixture()
@@ -30,4 +35,42 @@ def auth_headers() -> dict[str, str]:
 def clean_database() -> None:
     init_db()
     with get_session() as session:
-        session.exec(delete(Service))
+        for table in reversed(SQLModel.metadata.sorted_tables):
+            session.exec(delete(table))
+    invalidate_caches()
+    catalogue.reset()
+
+
+class Statement(NamedTuple):
+    sql: str
+    parameters: Any
+    executemany: bool
+
+
+@pytest.fixture()
+def record_statements() -> Iterator[Callable[..., list[Statement]]]:
+    """Record the SQL sent through an engine (the primary by default) from
+    the call until the end of the test."""
+    listeners = []
+
+    def record(engine: Optional[Engine] = None) -> list[Statement]:
+        engine = engine or db._engine
+        statements: list[Statement] = []
+
+        def _record(
+            conn: Any,
+            cursor: Any,
+            sql: str,
+            parameters: Any,
+            context: Any,
+            executemany: bool,
+        ) -> None:
+            statements.append(Statement(sql, parameters, executemany))
+
+        event.listen(engine, "before_cursor_execute", _record)
+        listeners.append((engine, _record))
+        return statements
+
+    yield record
+    for engine, listener in listeners:
+        event.remove(engine, "before_cursor_execute", listener)
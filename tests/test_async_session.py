@@ -0,0 +1,77 @@
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlmodel import SQLModel
+
+from svc_catalogue import db
+from svc_catalogue.config import settings
+from svc_catalogue.search import get_search_backend
+
+
+def test_async_database_url_maps_drivers() -> None:
+    assert (
+        db.async_database_url("postgresql://u:p@db:5432/svc")
+        == "postgresql+psycopg://u:p@db:5432/svc"
+    )
+    assert (
+        db.async_database_url("sqlite+pysqlite:///./svc.db")
+        == "sqlite+aiosqlite:///./svc.db"
+    )
+    with pytest.raises(ValueError):
+        db.async_database_url("mysql://db/svc")
+
+
+def test_routes_use_async_engine_when_enabled(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    client: TestClient,
+    auth_headers: dict[str, str],
+    record_statements,
+) -> None:
+    path = tmp_path / "async.db"
+    schema_engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(schema_engine)
+    with schema_engine.begin() as connection:
+        get_search_backend("sqlite").install(connection)
+    schema_engine.dispose()
+
+    monkeypatch.setattr(settings, "database_async", True)
+    monkeypatch.setattr(settings, "async_database_url", f"sqlite+aiosqlite:///{path}")
+    monkeypatch.setattr(db, "_async_engine", None)
+
+    statements = record_statements(db.get_async_engine().sync_engine)
+
+    payload = {
+        "name": "async-billing",
+        "owner_team": "Team A",
+        "tier": "gold",
+        "lifecycle": "production",
+        "endpoints": ["https://example.com/api"],
+        "tags": ["payments"],
+    }
+    created = client.post("/api/v1/services", json=payload, headers=auth_headers)
+    assert created.status_code == 201
+    service_id = created.json()["id"]
+    assert statements
+
+    listed = client.get(
+        "/api/v1/services", params={"search": "paymnts"}, headers=auth_headers
+    )
+    assert [item["name"] for item in listed.json()["items"]] == ["async-billing"]
+
+    updated = client.put(
+        f"/api/v1/services/{service_id}",
+        json={"lifecycle": "deprecated"},
+        headers={**auth_headers, "If-Match": created.headers["etag"]},
+    )
+    assert updated.json()["lifecycle"] == "deprecated"
+    assert client.get("/ready").json() == {"status": "ready"}
+    assert client.delete(
+        f"/api/v1/services/{service_id}", headers=auth_headers
+    ).status_code == (204)
+    assert (
+        client.get(f"/api/v1/services/{service_id}", headers=auth_headers).status_code
+        == 404
+    )
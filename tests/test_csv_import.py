@@ -1,3 +1,6 @@
+from uuid import UUID, uuid4
+
+import pytest
 from fastapi.testclient import TestClient
 
 
@@ -16,7 +19,13 @@ def test_csv_import_create_and_update(
     )
     assert response.status_code == 202
     result = response.json()
-    assert result == {"created": 1, "updated": 0, "errors": [], "total_rows": 1}
+    assert result == {
+        "created": 1,
+        "updated": 0,
+        "unchanged": 0,
+        "errors": [],
+        "total_rows": 1,
+    }
 
     update_csv = (
         "name,owner_team,tier,lifecycle,endpoints,tags,id\n"
@@ -30,7 +39,13 @@ def test_csv_import_create_and_update(
     )
     assert update_resp.status_code == 202
     update_result = update_resp.json()
-    assert update_result == {"created": 0, "updated": 1, "errors": [], "total_rows": 1}
+    assert update_result == {
+        "created": 0,
+        "updated": 1,
+        "unchanged": 0,
+        "errors": [],
+        "total_rows": 1,
+    }
 
     fetch = client.get("/api/v1/services", headers=auth_headers)
     assert fetch.status_code == 200
@@ -53,3 +68,411 @@ def test_csv_import_invalid_column(
     )
     assert response.status_code == 400
     assert "Unknown columns" in response.json()["detail"]
+
+
+def test_csv_import_bulk_chunks(
+    client: TestClient, auth_headers: dict[str, str], monkeypatch
+) -> None:
+    from svc_catalogue.config import settings
+
+    monkeypatch.setattr(settings, "csv_chunk_size", 2)
+    client.post(
+        "/api/v1/services",
+        json={
+            "name": "ledger",
+            "owner_team": "FinOps",
+            "tier": "gold",
+            "lifecycle": "production",
+        },
+        headers=auth_headers,
+    )
+    csv_data = (
+        "name,owner_team,tier,lifecycle,endpoints,tags,id\n"
+        "alpha,Data,silver,dev,,,\n"
+        "LEDGER,Platform,gold,preprod,,core,\n"
+        "beta,Data,unknown,dev,,,\n"
+        "alpha,Data,bronze,dev,,late,\n"
+        "gamma,Data,gold,dev,https://gamma.example.com,,\n"
+    )
+    response = client.post(
+        "/api/v1/services/import",
+        files={"file": ("services.csv", csv_data, "text/csv")},
+        headers=auth_headers,
+    )
+    assert response.status_code == 202
+    result = response.json()
+    assert result["created"] == 2
+    assert result["updated"] == 2
+    assert result["total_rows"] == 5
+    assert len(result["errors"]) == 1
+    assert result["errors"][0].startswith("row 3:")
+
+    items = {
+        item["name"]: item
+        for item in client.get("/api/v1/services", headers=auth_headers).json()["items"]
+    }
+    assert sorted(items) == ["alpha", "gamma", "ledger"]
+    assert items["ledger"]["owner_team"] == "Platform"
+    assert items["alpha"]["tier"] == "bronze"
+    assert items["alpha"]["tags"] == ["late"]
+
+
+def test_bulk_upsert_fallback() -> None:
+    from svc_catalogue.crud import (
+        _bulk_upsert_fallback,
+        get_service_by_name,
+        list_services,
+        service_values,
+    )
+    from svc_catalogue.db import get_session
+    from svc_catalogue.schemas import ServiceCreate
+
+    payload = {
+        "name": "fallback",
+        "owner_team": "Ops",
+        "tier": "gold",
+        "lifecycle": "dev",
+        "tags": ["legacy"],
+    }
+    with get_session() as session:
+        _bulk_upsert_fallback(session, [service_values(ServiceCreate(**payload))])
+        changed = ServiceCreate(**(payload | {"owner_team": "Core"}))
+        _bulk_upsert_fallback(session, [service_values(changed)])
+        service = get_service_by_name(session, "FALLBACK")
+        assert service is not None
+        assert service.owner_team == "Core"
+        tagged, _ = list_services(session, all_tags=["legacy"])
+        assert [item.name for item in tagged] == ["fallback"]
+
+
+def test_csv_import_streaming_commits_chunks(
+    client: TestClient, auth_headers: dict[str, str], monkeypatch
+) -> None:
+    from svc_catalogue.config import settings
+
+    monkeypatch.setattr(settings, "csv_chunk_size", 2)
+    monkeypatch.setattr(settings, "csv_max_rows", 1)
+    taken = client.post(
+        "/api/v1/services",
+        json={
+            "name": "taken",
+            "owner_team": "Ops",
+            "tier": "gold",
+            "lifecycle": "production",
+        },
+        headers=auth_headers,
+    ).json()["id"]
+    csv_data = (
+        "name,owner_team,tier,lifecycle,endpoints,tags,id\n"
+        "one,Data,gold,dev,,,\n"
+        "two,Data,gold,dev,,,\n"
+        f"three,Data,gold,dev,,,{taken}\n"
+        "four,Data,gold,dev,,,\n"
+        "five,Data,gold,dev,,,\n"
+    )
+    response = client.post(
+        "/api/v1/services/import",
+        params={"stream": "true"},
+        files={"file": ("services.csv", csv_data, "text/csv")},
+        headers=auth_headers,
+    )
+    assert response.status_code == 202
+    result = response.json()
+    assert result["created"] == 3
+    assert result["total_rows"] == 5
+    assert [chunk["committed"] for chunk in result["chunks"]] == [True, False, True]
+    assert result["chunks"][1]["first_row"] == 3
+    assert result["errors"][0].startswith("rows 3-4:")
+
+    names = {
+        item["name"]
+        for item in client.get("/api/v1/services", headers=auth_headers).json()["items"]
+    }
+    assert names == {"taken", "one", "two", "five"}
+
+
+def test_csv_import_aborts_on_invalid_utf8(
+    client: TestClient, auth_headers: dict[str, str], monkeypatch
+) -> None:
+    from svc_catalogue.config import settings
+    from svc_catalogue.jobs import import_jobs
+
+    monkeypatch.setattr(settings, "csv_chunk_size", 50)
+    # Past the first decoded block, so earlier chunks are already committed.
+    csv_data = b"name,owner_team,tier,lifecycle,endpoints,tags,id\n" + b"".join(
+        b"utf8-%04d,Data,gold,dev,,,\n" % index for index in range(600)
+    )
+    csv_data += b"bad-\xff,Data,gold,dev,,,\nafter,Data,gold,dev,,,\n"
+    files = {"file": ("services.csv", csv_data, "text/csv")}
+
+    streamed = client.post(
+        "/api/v1/services/import",
+        params={"stream": "true"},
+        files=files,
+        headers=auth_headers,
+    )
+    assert streamed.status_code == 400
+    assert "invalid UTF-8" in streamed.json()["detail"]
+    assert "already committed" in streamed.json()["detail"]
+    buffered = client.post("/api/v1/services/import", files=files, headers=auth_headers)
+    assert buffered.status_code == 400
+
+    job = client.post(
+        "/api/v1/services/import",
+        params={"background": "true"},
+        files=files,
+        headers=auth_headers,
+    ).json()
+    final = import_jobs.wait(UUID(job["id"]), timeout=10)
+    assert final.status == "failed"
+    assert "invalid UTF-8" in final.detail
+
+
+def test_csv_import_background_job(
+    client: TestClient, auth_headers: dict[str, str]
+) -> None:
+    from svc_catalogue.jobs import import_jobs
+
+    csv_data = (
+        "name,owner_team,tier,lifecycle,endpoints,tags,id\n"
+        "queued,Data,gold,dev,,,\n"
+        "broken,Data,gold,nowhere,,,\n"
+    )
+    response = client.post(
+        "/api/v1/services/import",
+        params={"background": "true"},
+        files={"file": ("services.csv", csv_data, "text/csv")},
+        headers=auth_headers,
+    )
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] in {"queued", "running", "succeeded"}
+
+    import_jobs.wait(UUID(job["id"]), timeout=10)
+    status_resp = client.get(
+        f"/api/v1/services/import/{job['id']}", headers=auth_headers
+    )
+    assert status_resp.status_code == 200
+    final = status_resp.json()
+    assert final["status"] == "succeeded"
+    assert final["rows_processed"] == 2
+    assert final["created"] == 1
+    assert len(final["errors"]) == 1
+
+    missing = client.get(f"/api/v1/services/import/{uuid4()}", headers=auth_headers)
+    assert missing.status_code == 404
+
+    dry_background = client.post(
+        "/api/v1/services/import",
+        params={"background": "true", "dry_run": "true"},
+        files={"file": ("services.csv", csv_data, "text/csv")},
+        headers=auth_headers,
+    )
+    assert dry_background.status_code == 400
+
+
+def test_import_jobs_not_started_fail_at_shutdown(monkeypatch, tmp_path) -> None:
+    import io
+    import threading
+
+    from fastapi import UploadFile
+
+    from svc_catalogue import jobs
+    from svc_catalogue.config import settings
+    from svc_catalogue.schemas import CSVImportResult
+
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_import(*args, **kwargs) -> CSVImportResult:
+        started.set()
+        release.wait(10)
+        return CSVImportResult(created=0, updated=0, total_rows=0)
+
+    monkeypatch.setattr(jobs, "import_services_from_csv", blocking_import)
+    monkeypatch.setattr(settings, "import_job_workers", 1)
+    monkeypatch.setattr(settings, "import_job_spool_dir", str(tmp_path))
+    manager = jobs.ImportJobManager()
+
+    class BrokenUpload(io.BytesIO):
+        def read(self, *args) -> bytes:
+            raise OSError("connection reset")
+
+    with pytest.raises(OSError):
+        manager.submit(UploadFile(BrokenUpload()))
+    assert list(tmp_path.iterdir()) == []
+
+    running = manager.submit(UploadFile(io.BytesIO(b"name\n")))
+    assert started.wait(10)
+    queued = manager.submit(UploadFile(io.BytesIO(b"name\n")))
+    manager.shutdown()
+    release.set()
+
+    cancelled = manager.wait(queued.id, timeout=10)
+    assert cancelled.status == "failed"
+    assert cancelled.detail == "Cancelled at shutdown"
+    assert cancelled.finished_at is not None
+    assert manager.wait(running.id, timeout=10).status == "succeeded"
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_parallel_validation_preserves_row_order(monkeypatch) -> None:
+    from svc_catalogue import csv_import
+    from svc_catalogue.config import settings
+
+    rows = [
+        (
+            number,
+            {
+                "name": f"svc-{number}",
+                "owner_team": "Data",
+                "tier": "gold" if number % 3 else "platinum",
+                "lifecycle": "dev",
+                "endpoints": "https://svc.example.com",
+                "tags": "A;b",
+                "id": "",
+            },
+        )
+        for number in range(1, 8)
+    ]
+    monkeypatch.setattr(settings, "csv_validation_workers", 2)
+    monkeypatch.setattr(settings, "csv_validation_batch_size", 2)
+    try:
+        parallel = csv_import._validate_chunk(rows)
+    finally:
+        csv_import.shutdown_validation_pool()
+    serial = csv_import.validate_rows(rows)
+
+    assert [number for number, _ in parallel] == list(range(1, 8))
+    assert [outcome for _, outcome in parallel if isinstance(outcome, str)] == [
+        outcome for _, outcome in serial if isinstance(outcome, str)
+    ]
+    valid = [outcome for _, outcome in parallel if not isinstance(outcome, str)]
+    assert len(valid) == 5
+    assert valid[0]["tags"] == ["a", "b"]
+    assert valid[0]["endpoints"] == ["https://svc.example.com/"]
+
+
+def test_csv_reimport_skips_unchanged_rows_and_dry_run(
+    client: TestClient, auth_headers: dict[str, str]
+) -> None:
+    csv_data = (
+        "name,owner_team,tier,lifecycle,endpoints,tags,id\n"
+        "stable,Data,gold,dev,https://stable.example.com,a;b,\n"
+        "moving,Data,gold,dev,,,\n"
+    )
+    files = {"file": ("services.csv", csv_data, "text/csv")}
+    first = client.post("/api/v1/services/import", files=files, headers=auth_headers)
+    assert first.json()["created"] == 2
+
+    again = client.post("/api/v1/services/import", files=files, headers=auth_headers)
+    assert again.json()["unchanged"] == 2
+    assert again.json()["updated"] == 0
+
+    changed_csv = csv_data.replace("moving,Data", "moving,Platform") + (
+        "fresh,Data,gold,dev,,,\n"
+    )
+    dry = client.post(
+        "/api/v1/services/import",
+        params={"dry_run": "true"},
+        files={"file": ("services.csv", changed_csv, "text/csv")},
+        headers=auth_headers,
+    ).json()
+    assert dry["diff"] == {
+        "created": ["fresh"],
+        "updated": ["moving"],
+        "unchanged": ["stable"],
+    }
+    listing = client.get("/api/v1/services", headers=auth_headers).json()
+    assert len(listing["items"]) == 2
+    assert {item["owner_team"] for item in listing["items"]} == {"Data"}
+
+
+def test_export_streams_ndjson_and_round_trips_csv(
+    client: TestClient, auth_headers: dict[str, str], monkeypatch
+) -> None:
+    import json
+
+    from svc_catalogue.config import settings
+
+    monkeypatch.setattr(settings, "export_batch_size", 2)
+    payloads = [
+        {
+            "name": f"export-{index}",
+            "owner_team": 'Core, "Platform"' if index == 0 else "Ops",
+            "tier": "gold",
+            "lifecycle": "production",
+            "endpoints": [f"https://export-{index}.example.com/api"],
+            "tags": ["shared", f"tag-{index}"] if index % 2 else [],
+        }
+        for index in range(5)
+    ]
+    for payload in payloads:
+        client.post("/api/v1/services", json=payload, headers=auth_headers)
+    listed = client.get("/api/v1/services", headers=auth_headers).json()["items"]
+
+    ndjson = client.get("/api/v1/services/export", headers=auth_headers)
+    assert ndjson.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in ndjson.text.splitlines()] == listed
+
+    exported = client.get(
+        "/api/v1/services/export", params={"format": "csv"}, headers=auth_headers
+    )
+    assert exported.headers["content-type"] == "text/csv; charset=utf-8"
+    assert "services.csv" in exported.headers["content-disposition"]
+    assert len(exported.text.splitlines()) == 6
+
+    for item in listed:
+        client.delete(f"/api/v1/services/{item['id']}", headers=auth_headers)
+    imported = client.post(
+        "/api/v1/services/import",
+        files={"file": ("services.csv", exported.content, "text/csv")},
+        headers=auth_headers,
+    ).json()
+    assert imported["created"] == 5
+    assert imported["errors"] == []
+    restored = client.get("/api/v1/services", headers=auth_headers).json()["items"]
+    keys = ("id", "name", "owner_team", "tier", "lifecycle", "endpoints", "tags")
+    assert [{key: item[key] for key in keys} for item in restored] == [
+        {key: item[key] for key in keys} for item in listed
+    ]
+
+    reimported = client.post(
+        "/api/v1/services/import",
+        files={"file": ("services.csv", exported.content, "text/csv")},
+        headers=auth_headers,
+    ).json()
+    assert reimported["unchanged"] == 5
+
+
+def test_validation_spreads_chunks_over_workers_while_writing(monkeypatch) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+    from io import StringIO
+
+    from svc_catalogue import csv_import
+    from svc_catalogue.config import settings
+    from svc_catalogue.db import get_session
+
+    batches: list[int] = []
+
+    class RecordingExecutor(ThreadPoolExecutor):
+        def submit(self, fn, rows):  # noqa: ANN001, ANN201
+            batches.append(len(rows))
+            return super().submit(fn, rows)
+
+    executor = RecordingExecutor(max_workers=4)
+    monkeypatch.setattr(csv_import, "_validation_executor", lambda: executor)
+    monkeypatch.setattr(settings, "csv_validation_workers", 4)
+    monkeypatch.setattr(settings, "csv_validation_batch_size", 250)
+    monkeypatch.setattr(settings, "csv_chunk_size", 7)
+    csv_data = "name,owner_team,tier,lifecycle,endpoints,tags,id\n" + "".join(
+        f"svc-{index},Data,gold,dev,,,\n" for index in range(10)
+    )
+    try:
+        with get_session() as session:
+            result = csv_import.import_services_from_csv(session, StringIO(csv_data))
+    finally:
+        executor.shutdown()
+
+    assert result.created == 10 and not result.errors
+    # Each chunk is split across all four workers despite the large batch size.
+    assert batches == [2, 2, 2, 1, 1, 1, 1]
@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, exc
+
+from svc_catalogue.config import settings
+from svc_catalogue.db import engine_options, get_session
+from svc_catalogue.metrics import instrument_pool, timed_checkout
+
+
+def _sample(name: str, pool: str) -> float:
+    value = REGISTRY.get_sample_value(name, {"pool": pool})
+    return value or 0.0
+
+
+def test_pool_settings_and_metrics(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    client: TestClient,
+) -> None:
+    monkeypatch.setattr(settings, "db_pool_size", 1)
+    monkeypatch.setattr(settings, "db_max_overflow", 1)
+    monkeypatch.setattr(settings, "db_pool_timeout", 0.05)
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    engine = create_engine(url, **engine_options(url, "test_pool"))
+    instrument_pool(engine, "test_pool")
+    assert engine.pool.size() == 1
+
+    timeouts = _sample("svc_catalogue_db_pool_checkout_timeouts_total", "test_pool")
+    with timed_checkout(engine):
+        first = engine.connect()
+    with timed_checkout(engine):
+        second = engine.connect()
+    assert _sample("svc_catalogue_db_pool_checked_out", "test_pool") == 2
+    assert _sample("svc_catalogue_db_pool_overflow", "test_pool") == 1
+    with pytest.raises(exc.TimeoutError), timed_checkout(engine):
+        engine.connect()
+    assert (
+        _sample("svc_catalogue_db_pool_checkout_timeouts_total", "test_pool")
+        == timeouts + 1
+    )
+    assert _sample("svc_catalogue_db_pool_checkout_seconds_count", "test_pool") == 2
+
+    second.close()
+    first.close()
+    # Checkouts outside ``timed_checkout`` are not observed.
+    engine.connect().close()
+    assert _sample("svc_catalogue_db_pool_checkout_seconds_count", "test_pool") == 2
+    assert _sample("svc_catalogue_db_pool_checked_out", "test_pool") == 0
+    engine.dispose()
+
+    # Session factories time their own checkouts.
+    checkouts = _sample("svc_catalogue_db_pool_checkout_seconds_count", "primary")
+    with get_session():
+        pass
+    assert (
+        _sample("svc_catalogue_db_pool_checkout_seconds_count", "primary")
+        == checkouts + 1
+    )
+
+    body = client.get("/metrics").text
+    assert 'svc_catalogue_db_pool_checked_out{pool="test_pool"}' in body
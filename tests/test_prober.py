@@ -0,0 +1,165 @@
+import asyncio
+import socket
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from svc_catalogue.prober import EndpointProber, ProbeTarget, run_probe_round
+
+
+class _Stub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+        self.connections: set[int] = set()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _Stub
+
+    def do_GET(self) -> None:  # noqa: N802
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.connections.add(self.client_address[1])
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(
+                self.server.max_in_flight, self.server.in_flight
+            )
+        try:
+            time.sleep(1.0 if self.path.startswith("/slow") else 0.05)
+            status = 503 if self.path.startswith("/fail") else 200
+            body = b"x" * 1_000_000 if self.path.startswith("/big") else b"ok"
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture()
+def stub() -> Iterator[_Stub]:
+    server = _Stub()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_probes_endpoints_within_limits_and_stores_results(
+    stub: _Stub, client: TestClient, auth_headers: dict[str, str]
+) -> None:
+    base = f"http://127.0.0.1:{stub.server_address[1]}"
+    healthy = [f"{base}/ok/{index}" for index in range(6)]
+    endpoints = {
+        "healthy": healthy,
+        "flaky": [f"{base}/fail", f"{base}/slow"],
+        "gone": [f"http://127.0.0.1:{_closed_port()}/"],
+    }
+    ids = {}
+    for name, urls in endpoints.items():
+        response = client.post(
+            "/api/v1/services",
+            json={
+                "name": name,
+                "owner_team": "Ops",
+                "tier": "gold",
+                "lifecycle": "production",
+                "endpoints": urls,
+            },
+            headers=auth_headers,
+        )
+        ids[name] = response.json()["id"]
+
+    prober = EndpointProber(
+        concurrency=10, per_host_concurrency=2, timeout=0.5, jitter_seconds=0.01
+    )
+    results = asyncio.run(run_probe_round(prober))
+
+    assert sorted(result.outcome for result in results) == [
+        "down",
+        "error",
+        "timeout",
+        *["up"] * 6,
+    ]
+    # 127.0.0.1 is one host: at most two probes in flight, over reused connections.
+    assert stub.max_in_flight <= 2
+    assert len(stub.connections) < stub.requests
+
+    statuses = {
+        name: client.get(
+            f"/api/v1/services/{service_id}/endpoints", headers=auth_headers
+        ).json()
+        for name, service_id in ids.items()
+    }
+    assert [item["last_status"] for item in statuses["healthy"]] == [200] * 6
+    assert all(item["last_latency_ms"] > 0 for item in statuses["healthy"])
+    flaky = {item["path"]: item for item in statuses["flaky"]}
+    assert flaky["/fail"]["last_status"] == 503
+    assert flaky["/slow"]["last_error"] == "timeout"
+    assert statuses["gone"][0]["last_status"] is None
+    assert statuses["gone"][0]["last_error"]
+    assert statuses["gone"][0]["last_probed_at"] is not None
+
+    endpoints = {
+        outcome: REGISTRY.get_sample_value(
+            "svc_catalogue_endpoints", {"outcome": outcome}
+        )
+        for outcome in ("up", "down", "timeout", "error")
+    }
+    assert endpoints == {"up": 6, "down": 1, "timeout": 1, "error": 1}
+
+    # Unchanged endpoints keep their results across service updates.
+    client.put(
+        f"/api/v1/services/{ids['healthy']}",
+        json={"endpoints": healthy[:1]},
+        headers=auth_headers,
+    )
+    kept = client.get(
+        f"/api/v1/services/{ids['healthy']}/endpoints", headers=auth_headers
+    ).json()
+    assert [(item["url"], item["last_status"]) for item in kept] == [(healthy[0], 200)]
+    missing = client.get(
+        "/api/v1/services/00000000-0000-0000-0000-000000000000/endpoints",
+        headers=auth_headers,
+    )
+    assert missing.status_code == 404
+
+
+def test_large_bodies_are_not_read_to_the_end(stub: _Stub) -> None:
+    base = f"http://127.0.0.1:{stub.server_address[1]}"
+    targets = [
+        ProbeTarget(uuid4(), "big", f"{base}/big", "127.0.0.1"),
+        ProbeTarget(uuid4(), "small", f"{base}/ok/1", "127.0.0.1"),
+    ]
+    prober = EndpointProber(
+        concurrency=1, timeout=5, jitter_seconds=0, max_body_bytes=1024
+    )
+    results = asyncio.run(prober.probe_all(targets))
+
+    assert [result.status for result in results] == [200, 200]
+    # The cut-off response closed its connection; the next probe opened one.
+    assert len(stub.connections) == 2
@@ -0,0 +1,159 @@
+"""EXPLAIN the statements ``crud`` issues and fail on sequential scans.
+
+SQLite always runs; PostgreSQL runs when ``TEST_POSTGRES_URL`` points at a
+scratch database (tables are created there and emptied afterwards).
+"""
+
+import json
+import os
+from collections.abc import Iterator
+from typing import Any
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, delete
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel
+
+from svc_catalogue import crud
+from svc_catalogue.schemas import CountMode, ServiceCreate
+from svc_catalogue.search import configure_engine, get_search_backend
+
+
+def _make_engine(url: str) -> Engine:
+    if url.startswith("sqlite"):
+        engine = create_engine(
+            url, connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+    else:
+        engine = create_engine(url)
+    configure_engine(engine)
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        get_search_backend(connection.dialect.name).install(connection)
+    return engine
+
+
+_URLS = ["sqlite+pysqlite:///:memory:"]
+if os.environ.get("TEST_POSTGRES_URL"):
+    _URLS.append(os.environ["TEST_POSTGRES_URL"])
+
+
+@pytest.fixture(params=_URLS, ids=lambda url: url.split(":")[0])
+def engine(request: pytest.FixtureRequest) -> Iterator[Engine]:
+    engine = _make_engine(request.param)
+    yield engine
+    with Session(engine) as session:
+        for table in reversed(SQLModel.metadata.sorted_tables):
+            session.execute(delete(table))
+        session.commit()
+    engine.dispose()
+
+
+def _seed(session: Session) -> None:
+    for index in range(20):
+        crud.create_service(
+            session,
+            ServiceCreate(
+                name=f"service-{index:02d}",
+                owner_team=f"Team {index % 4}",
+                tier=["gold", "silver", "bronze"][index % 3],
+                lifecycle=["production", "dev"][index % 2],
+                endpoints=[f"https://svc-{index}.example.com/api"],
+                tags=[f"tag-{index % 5}", "shared"],
+            ),
+        )
+    session.commit()
+
+
+def _exercise_crud(session: Session) -> None:
+    crud.get_service_by_name(session, "SERVICE-03")
+    crud.get_existing_by_names(session, ["service-01", "Service-02", "missing"])
+    crud.get_service(session, crud.get_service_by_name(session, "service-04").id)
+    crud.lookup_services(session, [uuid4()], ["Service-05", "missing"])
+    crud.lookup_services(session, names=["service-06"], fields=["id", "name"])
+    filter_sets: list[dict[str, Any]] = [
+        {"owner_team": "team 1"},
+        {"tier": "gold"},
+        {"lifecycle": "dev"},
+        {"owner_team": "TEAM 2", "lifecycle": "production"},
+        {"tier": "silver", "lifecycle": "dev"},
+        {"all_tags": ["tag-1"]},
+        {"all_tags": ["tag-1", "shared"]},
+        {"any_tags": ["tag-2", "tag-3"]},
+        {"search": "service-1"},
+    ]
+    for filters in filter_sets:
+        crud.list_services(session, **filters, limit=5, count=CountMode.exact)
+        crud.facet_counts(session, crud.ServiceFilter.build(**filters))
+    crud.facet_counts(session, crud.ServiceFilter.build())
+    crud.list_services(session, limit=5, count=CountMode.none)
+    crud.list_services(
+        session, any_tags=["tag-2", "tag-3"], limit=5, count=CountMode.estimate
+    )
+    crud.list_changes(session, since=3, limit=5)
+    crud.list_tags(session, "tag-")
+    crud.find_services_by_endpoint(session, url="https://svc-3.example.com/api/x")
+    crud.find_services_by_endpoint(session, host="svc-4.example.com")
+    crud.list_tags(session)
+    crud.list_services(session, after=("service-05", uuid4()), limit=5)
+
+
+def _plan_lines(connection: Any, statement: str, parameters: Any) -> list[str]:
+    if connection.dialect.name == "sqlite":
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[-1] for row in rows]
+    connection.exec_driver_sql("SET enable_seqscan = off")
+    plan = connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {statement}", parameters
+    ).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    lines: list[str] = []
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        lines.append(f"{node['Node Type']} {node.get('Relation Name', '')}".strip())
+        nodes.extend(node.get("Plans", []))
+    return lines
+
+
+def _sequential_scans(lines: list[str]) -> list[str]:
+    # Scanning the rows a derived table (co-routine) produced is not a table scan.
+    derived = {line.split()[-1] for line in lines if line.startswith("CO-ROUTINE ")}
+    return [
+        line
+        for line in lines
+        if line.startswith("Seq Scan")
+        or (
+            line.startswith("SCAN ")
+            and "USING" not in line
+            and "VIRTUAL TABLE" not in line
+            and "SUBQUERY" not in line
+            and line.split()[1] not in derived
+        )
+    ]
+
+
+def test_crud_queries_use_indexes(engine: Engine, record_statements) -> None:
+    with Session(engine) as session:
+        _seed(session)
+
+    crud._count_cache.clear()
+    crud._facet_cache.clear()
+    recorded = record_statements(engine)
+    with Session(engine) as session:
+        _exercise_crud(session)
+    statements = [
+        (s.sql, s.parameters)
+        for s in recorded
+        if not s.executemany and s.sql.lstrip().upper().startswith("SELECT")
+    ]
+
+    assert statements
+    with engine.connect() as connection:
+        for statement, parameters in statements:
+            lines = _plan_lines(connection, statement, parameters)
+            scans = _sequential_scans(lines)
+            assert not scans, f"sequential scan in plan {lines} for:\n{statement}"
@@ -0,0 +1,97 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from svc_catalogue.config import settings
+from svc_catalogue.crud import create_service
+from svc_catalogue.db import get_session
+from svc_catalogue.read_model import catalogue
+from svc_catalogue.schemas import ServiceCreate
+
+QUERIES = [
+    {},
+    {"owner_team": "payments"},
+    {"tier": "gold", "lifecycle": "production"},
+    {"tag": "pci"},
+    {"any_tags": ["pci", "batch"]},
+    {"search": "ledgr"},
+    {"search": "ab"},
+    {"limit": 2},
+    {"limit": 2, "offset": 1, "count": "none"},
+    {"tier": "gold", "limit": 1, "offset": 1},
+    {"any_tags": ["pci", "batch"], "owner_team": "payments", "limit": 1},
+]
+
+
+def _payload(name: str, **overrides: object) -> dict[str, object]:
+    return {
+        "name": name,
+        "owner_team": "Payments",
+        "tier": "gold",
+        "lifecycle": "production",
+        **overrides,
+    }
+
+
+def _list(client: TestClient, headers: dict[str, str], params: dict) -> dict:
+    response = client.get("/api/v1/services", params=params, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_read_model_matches_sql_and_follows_writes(
+    monkeypatch: pytest.MonkeyPatch,
+    client: TestClient,
+    auth_headers: dict[str, str],
+) -> None:
+    for payload in [
+        _payload("ledger", tags=["pci"]),
+        _payload("abacus", tier="silver", tags=["batch"]),
+        _payload("gateway", owner_team="Edge", tags=["pci", "edge"]),
+        _payload("reports", lifecycle="deprecated"),
+    ]:
+        client.post("/api/v1/services", json=payload, headers=auth_headers)
+    expected = [_list(client, auth_headers, params) for params in QUERIES]
+    cursor = _list(client, auth_headers, {"limit": 2})["next_cursor"]
+    expected_after = _list(client, auth_headers, {"cursor": cursor})
+
+    monkeypatch.setattr(settings, "read_model_enabled", True)
+    monkeypatch.setattr(settings, "read_model_refresh_seconds", 3600.0)
+    assert [_list(client, auth_headers, params) for params in QUERIES] == expected
+    assert _list(client, auth_headers, {"cursor": cursor}) == expected_after
+    assert catalogue.loaded
+    estimated = _list(client, auth_headers, {"tier": "gold", "count": "estimate"})
+    assert estimated["total"] == 3
+    monkeypatch.setattr(settings, "read_model_search_candidates", 1)
+    capped = _list(client, auth_headers, {"search": "a"})
+    assert capped["total"] == 1
+    monkeypatch.setattr(settings, "read_model_search_candidates", 1000)
+
+    ledger = next(item for item in expected[0]["items"] if item["name"] == "ledger")
+    item = client.get(f"/api/v1/services/{ledger['id']}", headers=auth_headers)
+    assert item.json() == ledger
+    sparse = client.get(
+        f"/api/v1/services/{ledger['id']}",
+        params={"fields": "name"},
+        headers=auth_headers,
+    )
+    assert sparse.json() == {"id": ledger["id"], "name": "ledger"}
+
+    # Writes committed by this process mark the snapshot dirty.
+    client.put(
+        f"/api/v1/services/{ledger['id']}",
+        json={"tags": ["ledger"]},
+        headers=auth_headers,
+    )
+    assert _list(client, auth_headers, {"tag": "pci"})["total"] == 1
+    client.delete(f"/api/v1/services/{ledger['id']}", headers=auth_headers)
+    missing = client.get(f"/api/v1/services/{ledger['id']}", headers=auth_headers)
+    assert missing.status_code == 404
+
+    # Writes from another worker arrive with the next timed refresh.
+    with get_session() as session:
+        create_service(session, ServiceCreate(**_payload("elsewhere")))
+    catalogue.dirty = False  # as if committed by another process
+    assert _list(client, auth_headers, {"search": "elsewhere"})["total"] == 0
+    monkeypatch.setattr(settings, "read_model_refresh_seconds", 0.0)
+    names = [item["name"] for item in _list(client, auth_headers, {})["items"]]
+    assert names == ["abacus", "elsewhere", "gateway", "reports"]
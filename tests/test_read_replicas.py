@@ -0,0 +1,106 @@
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel
+
+from svc_catalogue import db
+from svc_catalogue.crud import create_service
+from svc_catalogue.replicas import ReplicaRouter
+from svc_catalogue.schemas import ServiceCreate
+from svc_catalogue.search import get_search_backend
+
+
+def _replica(tmp_path: Path, name: str, service: str):  # noqa: ANN202
+    replica = db.create_replica(f"sqlite:///{tmp_path / name}.db", name)
+    SQLModel.metadata.create_all(replica.engine)
+    with replica.engine.begin() as connection:
+        get_search_backend("sqlite").install(connection)
+    with Session(replica.engine) as session:
+        create_service(
+            session,
+            ServiceCreate(
+                name=service, owner_team="Ops", tier="gold", lifecycle="production"
+            ),
+        )
+        session.commit()
+    return replica
+
+
+def _names(client: TestClient, headers: dict[str, str]) -> list[str]:
+    response = client.get("/api/v1/services", headers=headers)
+    return [item["name"] for item in response.json()["items"]]
+
+
+def _broken(tmp_path: Path):  # noqa: ANN202
+    return db.create_replica(f"sqlite:///{tmp_path / 'missing' / 'x.db'}", "broken")
+
+
+def test_reads_rotate_across_replicas_and_fail_over_to_primary(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    client: TestClient,
+    auth_headers: dict[str, str],
+) -> None:
+    client.post(
+        "/api/v1/services",
+        json={
+            "name": "on-primary",
+            "owner_team": "Ops",
+            "tier": "gold",
+            "lifecycle": "production",
+        },
+        headers=auth_headers,
+    )
+    first = _replica(tmp_path, "replica_a", "on-a")
+    second = _replica(tmp_path, "replica_b", "on-b")
+    broken = _broken(tmp_path)
+    router = ReplicaRouter([first, broken, second], eject_seconds=60)
+    monkeypatch.setattr(db, "read_replicas", router)
+    # Health checks are fresh, so the broken replica is only found by a read.
+    for replica in router.replicas:
+        replica.checked_at = time.monotonic()
+
+    seen = {tuple(_names(client, auth_headers)) for _ in range(4)}
+    assert seen == {("on-a",), ("on-primary",), ("on-b",)}
+    assert broken.ejected_until > 0
+    assert router.candidates() and broken not in router.candidates()
+
+    primary = {**auth_headers, "X-Read-Primary": "true"}
+    assert _names(client, primary) == ["on-primary"]
+    assert client.get("/ready").json() == {"status": "ready"}
+
+    for replica in (first, second):
+        router.eject(replica)
+    assert _names(client, auth_headers) == ["on-primary"]
+
+
+def test_background_health_check_ejects_unreachable_replica(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    client: TestClient,
+    auth_headers: dict[str, str],
+) -> None:
+    broken = _broken(tmp_path)
+    healthy = _replica(tmp_path, "replica_a", "on-a")
+    router = ReplicaRouter([healthy, broken], eject_seconds=60)
+    monkeypatch.setattr(db, "read_replicas", router)
+
+    assert _names(client, auth_headers) == ["on-a"]
+    deadline = time.monotonic() + 5
+    while not broken.ejected_until and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert broken.ejected_until > 0
+    assert healthy.ejected_until == 0
+    assert router.candidates() == [healthy]
+
+
+def test_least_connections_prefers_idle_replica(tmp_path: Path) -> None:
+    busy = _replica(tmp_path, "busy", "on-busy")
+    idle = _replica(tmp_path, "idle", "on-idle")
+    router = ReplicaRouter([busy, idle], routing="least_connections")
+    with busy.engine.connect():
+        assert router.candidates()[0] is idle
+    with idle.engine.connect(), idle.engine.connect():
+        assert router.candidates()[0] is busy
@@ -1,6 +1,9 @@
 from uuid import UUID
 
 from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from svc_catalogue.db import get_session, init_db
 
 
 def _create_payload(name: str, owner: str = "Team A") -> dict[str, object]:
@@ -100,3 +103,652 @@ def test_list_filters_and_search(
 def test_auth_required(client: TestClient) -> None:
     response = client.get("/api/v1/services")
     assert response.status_code == 401
+
+
+def test_update_without_changes_skips_write(
+    client: TestClient, auth_headers: dict[str, str], record_statements
+) -> None:
+    create = client.post(
+        "/api/v1/services", json=_create_payload("steady"), headers=auth_headers
+    )
+    service_id = create.json()["id"]
+
+    statements = record_statements()
+    update_resp = client.put(
+        f"/api/v1/services/{service_id}",
+        json={"owner_team": "Team A", "tags": ["Payments", "critical"]},
+        headers=auth_headers,
+    )
+    assert update_resp.status_code == 200
+    assert update_resp.json()["updated_at"] == create.json()["updated_at"]
+    assert not [s for s in statements if s.sql.lstrip().upper().startswith("UPDATE")]
+
+
+def test_list_cursor_pagination(
+    client: TestClient, auth_headers: dict[str, str]
+) -> None:
+    for name in ["delta", "alpha", "charlie", "bravo", "echo"]:
+        client.post(
+            "/api/v1/services", json=_create_payload(name), headers=auth_headers
+        )
+
+    seen: list[str] = []
+    params: dict[str, object] = {"limit": 2}
+    while True:
+        page = client.get("/api/v1/services", params=params, headers=auth_headers)
+        assert page.status_code == 200
+        body = page.json()
+        seen.extend(item["name"] for item in body["items"])
+        if body["next_cursor"] is None:
+            break
+        params = {"limit": 2, "cursor": body["next_cursor"]}
+    assert seen == ["alpha", "bravo", "charlie", "delta", "echo"]
+
+    invalid = client.get(
+        "/api/v1/services", params={"cursor": "not-a-cursor"}, headers=auth_headers
+    )
+    assert invalid.status_code == 400
+
+
+def test_list_count_modes_and_cache_invalidation(
+    client: TestClient, auth_headers: dict[str, str]
+) -> None:
+    client.post("/api/v1/services", json=_create_payload("one"), headers=auth_headers)
+    client.post("/api/v1/services", json=_create_payload("two"), headers=auth_headers)
+
+    exact = client.get("/api/v1/services", headers=auth_headers).json()
+    assert exact["total"] == 2
+
+    none = client.get(
+        "/api/v1/services", params={"count": "none"}, headers=auth_headers
+    ).json()
+    assert none["total"] is None
+    assert len(none["items"]) == 2
+
+    estimate = client.get(
+        "/api/v1/services", params={"count": "estimate"}, headers=auth_headers
+    ).json()
+    assert estimate["total"] == 2
+
+    created = client.post(
+        "/api/v1/services", json=_create_payload("three"), headers=auth_headers
+    )
+    assert client.get("/api/v1/services", headers=auth_headers).json()["total"] == 3
+
+    client.delete(f"/api/v1/services/{created.json()['id']}", headers=auth_headers)
+    assert client.get("/api/v1/services", headers=auth_headers).json()["total"] == 2
+
+
+def test_search_is_ranked_and_typo_tolerant(
+    client: TestClient, auth_headers: dict[str, str]
+) -> None:
+    client.post(
+        "/api/v1/services",
+        json=_create_payload("payments-gateway"),
+        headers=auth_headers,
+    )
+    client.post(
+        "/api/v1/services",
+        json={**_create_payload("ledger"), "tags": ["accounting"]},
+        headers=auth_headers,
+    )
+
+    typo = client.get(
+        "/api/v1/services", params={"search": "paymnts"}, headers=auth_headers
+    ).json()
+    assert [item["name"] for item in typo["items"]] == ["payments-gateway"]
+
+    substring = client.get(
+        "/api/v1/services", params={"search": "count"}, headers=auth_headers
+    ).json()
+    assert [item["name"] for item in substring["items"]] == ["ledger"]
+    assert substring["next_cursor"] is None
+
+    client.put(
+        f"/api/v1/services/{substring['items'][0]['id']}",
+        json={"tags": ["bookkeeping"]},
+        headers=auth_headers,
+    )
+    stale = client.get(
+        "/api/v1/services", params={"search": "accounting"}, headers=auth_headers
+    ).json()
+    assert stale["items"] == []
+
+    rejected = client.get(
+        "/api/v1/services",
+        params={"search": "ledger", "cursor": "abc"},
+        headers=auth_headers,
+    )
+    assert rejected.status_code == 400
+
+
+def test_tag_filters_use_exact_matches(
+    client: TestClient, auth_headers: dict[str, str]
+) -> None:
+    client.post(
+        "/api/v1/services",
+        json={**_create_payload("alpha"), "tags": ["payments", "critical"]},
+        headers=auth_headers,
+    )
+    beta = client.post(
+        "/api/v1/services",
+        json={**_create_payload("beta"), "tags": ["payment", "batch"]},
+        headers=auth_headers,
+    ).json()
+    csv_data = (
+        "name,owner_team,tier,lifecycle,endpoints,tags,id\n"
+        "gamma,Data,gold,dev,,critical;batch,\n"
+    )
+    client.post(
+        "/api/v1/services/import",
+        files={"file": ("services.csv", csv_data, "text/csv")},
+        headers=auth_headers,
+    )
+
+    def names(**params: object) -> list[str]:
+        response = client.get("/api/v1/services", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        return [item["name"] for item in response.json()["items"]]
+
+    assert names(tag="payment") == ["beta"]
+    assert names(tag="Critical") == ["alpha", "gamma"]
+    assert names(all_tags=["critical", "batch"]) == ["gamma"]
+    assert names(any_tags=["payments", "batch"]) == ["alpha", "beta", "gamma"]
+    assert names(tag="batch", owner_team="Data") == ["gamma"]
+
+    client.put(
+        f"/api/v1/services/{beta['id']}",
+        json={"tags": ["streaming"]},
+        headers=auth_headers,
+    )
+    assert names(tag="batch") == ["gamma"]
+    client.delete(f"/api/v1/services/{beta['id']}", headers=auth_headers)
+    assert names(tag="streaming") == []
+
+
+def test_conditional_get_and_if_match(
+    client: TestClient, auth_headers: dict[str, str]
+) -> None:
+    create = client.post(
+        "/api/v1/services", json=_create_payload("ledger"), headers=auth_headers
+    )
+    etag = create.headers["etag"]
+    service_id = create.json()["id"]
+    url = f"/api/v1/services/{service_id}"
+
+    fetched = client.get(url, headers=auth_headers)
+    assert fetched.headers["etag"] == etag
+    modified = fetched.headers["last-modified"]
+
+    cached = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+    since = client.get(url, headers={**auth_headers, "If-Modified-Since": modified})
+    assert since.status_code == 304
+
+    page = client.get("/api/v1/services", headers=auth_headers)
+    list_tag = page.headers["etag"]
+    cached_page = client.get(
+        "/api/v1/services", headers={**auth_headers, "If-None-Match": list_tag}
+    )
+    assert cached_page.status_code == 304
+    assert page.headers["last-modified"] == modified
+    page_since = client.get(
+        "/api/v1/services", headers={**auth_headers, "If-Modified-Since": modified}
+    )
+    assert page_since.status_code == 304
+    assert page_since.headers["last-modified"] == modified
+
+    updated = client.put(
+        url,
+        json={"owner_team": "Team B"},
+        headers={**auth_headers, "If-Match": etag},
+    )
+    assert updated.status_code == 200
+    assert updated.headers["etag"] != etag
+
+    stale = client.put(
+        url,
+        json={"owner_team": "Team C"},
+        headers={**auth_headers, "If-Match": etag},
+    )
+    assert stale.status_code == 412
+    assert client.get(url, headers=auth_headers).json()["owner_team"] == "Team B"
+    stale_delete = client.delete(url, headers={**auth_headers, "If-Match": etag})
+    assert stale_delete.status_code == 412
+
+    refreshed = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert refreshed.status_code == 200
+    changed_page = client.get(
+        "/api/v1/services", headers={**auth_headers, "If-None-Match": list_tag}
+    )
+    assert changed_page.status_code == 200
+
+    deleted = client.delete(
+        url, headers={**auth_headers, "If-Match": updated.headers["etag"]}
+    )
+    assert deleted.status_code == 204
+
+
+def test_fast_read_path_matches_model_serialization(
+    client: TestClient, auth_headers: dict[str, str]
+) -> None:
+    from svc_catalogue.schemas import ServiceList
+
+    created = client.post(
+        "/api/v1/services",
+        json=_create_payload("fastpath") | {"endpoints": ["HTTPS://Example.com"]},
+        headers=auth_headers,
+    ).json()
+    page = client.get("/api/v1/services", headers=auth_headers)
+    assert page.headers["content-type"] == "application/json"
+    body = page.json()
+    assert ServiceList.model_validate(body).model_dump(mode="json") == body
+    assert body["items"] == [created]
+    item = client.get(f"/api/v1/services/{created['id']}", headers=auth_headers)
+    assert item.json() == created
+
+
+def test_sparse_fieldsets_project_columns(
+    client: TestClient, auth_headers: dict[str, str], record_statements
+) -> None:
+    created = client.post(
+        "/api/v1/services", json=_create_payload("sparse"), headers=auth_headers
+    ).json()
+
+    statements = record_statements()
+    page = client.get(
+        "/api/v1/services",
+        params={"fields": "owner_team,name,id", "count": "none"},
+        headers=auth_headers,
+    )
+    assert page.json()["items"] == [
+        {"id": created["id"], "name": "sparse", "owner_team": "Team A"}
+    ]
+    assert statements
+    assert not [s for s in statements if "endpoints" in s.sql or "tags" in s.sql]
+
+    url = f"/api/v1/services/{created['id']}"
+    item = client.get(
+        url, params=[("fields", "tags"), ("fields", "tier")], headers=auth_headers
+    )
+    assert item.json() == {
+        "id": created["id"],
+        "name": "sparse",
+        "tier": "gold",
+        "tags": ["payments", "critical"],
+    }
+    full = client.get(url, headers=auth_headers)
+    assert item.headers["etag"] != full.headers["etag"]
+
+    schema = client.get("/openapi.json").json()["components"]["schemas"]
+    assert schema["ServiceReadPartial"]["required"] == ["id", "name"]
+
+    bad = client.get(url, params={"fields": "name,secret"}, headers=auth_headers)
+    assert bad.status_code == 400
+    assert bad.json()["detail"] == "Unknown fields: secret"
+
+
+def test_batch_applies_bulk_operations(
+    client: TestClient, auth_headers: dict[str, str], monkeypatch, record_statements
+) -> None:
+    from svc_catalogue import batch
+    from svc_catalogue.config import settings
+
+    keep = client.post(
+        "/api/v1/services", json=_create_payload("keep"), headers=auth_headers
+    ).json()
+    drop = client.post(
+        "/api/v1/services", json=_create_payload("drop"), headers=auth_headers
+    ).json()
+    operations = [
+        {"op": "create", "service": _create_payload("new-a")},
+        {"op": "create", "service": _create_payload("new-b")},
+        {"op": "update", "id": keep["id"], "changes": {"tier": "bronze"}},
+        {"op": "delete", "id": drop["id"]},
+    ]
+
+    statements = record_statements()
+    response = client.post(
+        "/api/v1/services:batch",
+        json={"operations": operations},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["committed"] is True
+    assert [item["status"] for item in body["results"]] == [201, 201, 200, 204]
+    assert len([s for s in statements if s.sql.startswith("INSERT INTO service ")]) == 1
+    names = [
+        item["name"]
+        for item in client.get("/api/v1/services", headers=auth_headers).json()["items"]
+    ]
+    assert names == ["keep", "new-a", "new-b"]
+    assert (
+        client.get(f"/api/v1/services/{keep['id']}", headers=auth_headers).json()[
+            "tier"
+        ]
+        == "bronze"
+    )
+
+    mixed = [
+        {"op": "create", "service": _create_payload("new-c")},
+        {"op": "create", "service": _create_payload("NEW-A")},
+        {"op": "delete", "id": drop["id"]},
+    ]
+    aborted = client.post(
+        "/api/v1/services:batch", json={"operations": mixed}, headers=auth_headers
+    )
+    assert aborted.status_code == 409
+    assert [item["status"] for item in aborted.json()["results"]] == [424, 409, 404]
+    best_effort = client.post(
+        "/api/v1/services:batch",
+        json={"mode": "best_effort", "operations": mixed},
+        headers=auth_headers,
+    )
+    assert best_effort.status_code == 200
+    assert [item["status"] for item in best_effort.json()["results"]] == [201, 409, 404]
+
+    # A concurrent insert of the same name only fails that operation.
+    monkeypatch.setattr(batch, "get_existing_by_names", lambda session, names: {})
+    raced = client.post(
+        "/api/v1/services:batch",
+        json={
+            "mode": "best_effort",
+            "operations": [
+                {"op": "create", "service": _create_payload("new-d")},
+                {"op": "create", "service": _create_payload("new-a")},
+            ],
+        },
+        headers=auth_headers,
+    ).json()
+    assert [item["status"] for item in raced["results"]] == [201, 409]
+    assert client.get(
+        "/api/v1/services", params={"search": "new-d"}, headers=auth_headers
+    ).json()["items"]
+
+    # An atomic batch names the conflicting operation and writes nothing.
+    raced_atomic = client.post(
+        "/api/v1/services:batch",
+        json={
+            "operations": [
+                {"op": "create", "service": _create_payload("new-e")},
+                {"op": "create", "service": _create_payload("new-a")},
+            ],
+        },
+        headers=auth_headers,
+    )
+    assert raced_atomic.status_code == 409
+    assert [item["status"] for item in raced_atomic.json()["results"]] == [424, 409]
+    names = [
+        item["name"]
+        for item in client.get("/api/v1/services", headers=auth_headers).json()["items"]
+    ]
+    assert "new-e" not in names
+
+    monkeypatch.setattr(settings, "batch_max_operations", 1)
+    too_big = client.post(
+        "/api/v1/services:batch", json={"operations": mixed}, headers=auth_headers
+    )
+    assert too_big.status_code == 413
+
+
+def test_lookup_by_ids_and_names(
+    client: TestClient, auth_headers: dict[str, str], monkeypatch
+) -> None:
+    from svc_catalogue.config import settings
+
+    first = client.post(
+        "/api/v1/services", json=_create_payload("lookup-a"), headers=auth_headers
+    ).json()
+    client.post(
+        "/api/v1/services", json=_create_payload("lookup-b"), headers=auth_headers
+    )
+    missing_id = "00000000-0000-0000-0000-000000000001"
+    response = client.post(
+        "/api/v1/services:lookup",
+        params={"fields": "id,name"},
+        json={
+            "ids": [first["id"], missing_id],
+            "names": ["LOOKUP-B", "lookup-a", "nope"],
+        },
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "items": [
+            {"id": first["id"], "name": "lookup-a"},
+            {"id": response.json()["items"][1]["id"], "name": "lookup-b"},
+        ],
+        "missing_ids": [missing_id],
+        "missing_names": ["nope"],
+    }
+
+    monkeypatch.setattr(settings, "lookup_max_keys", 2)
+    too_many = client.post(
+        "/api/v1/services:lookup",
+        json={"ids": [first["id"]], "names": ["a", "b"]},
+        headers=auth_headers,
+    )
+    assert too_many.status_code == 413
+
+
+def test_change_feed_orders_writes_and_long_polls(
+    client: TestClient, auth_headers: dict[str, str], monkeypatch
+) -> None:
+    import threading
+    import time
+
+    from svc_catalogue.config import settings
+
+    # Only the commit notification, not re-polling, can end the wait early.
+    monkeypatch.setattr(settings, "change_feed_poll_seconds", 60.0)
+
+    alpha = client.post(
+        "/api/v1/services", json=_create_payload("alpha"), headers=auth_headers
+    ).json()
+    beta = client.post(
+        "/api/v1/services", json=_create_payload("beta"), headers=auth_headers
+    ).json()
+    client.put(
+        f"/api/v1/services/{alpha['id']}",
+        json={"tier": "silver"},
+        headers=auth_headers,
+    )
+    client.delete(f"/api/v1/services/{beta['id']}", headers=auth_headers)
+    client.post(
+        "/api/v1/services/import",
+        files={
+            "file": (
+                "services.csv",
+                "name,owner_team,tier,lifecycle,endpoints,tags,id\n"
+                "gamma,Ops,gold,dev,,,\nalpha,Ops,silver,production,,,\n",
+                "text/csv",
+            )
+        },
+        headers=auth_headers,
+    )
+
+    first = client.get(
+        "/api/v1/services/changes", params={"limit": 3}, headers=auth_headers
+    ).json()
+    rest = client.get(
+        "/api/v1/services/changes",
+        params={"since": first["next_cursor"]},
+        headers=auth_headers,
+    ).json()
+    changes = first["changes"] + rest["changes"]
+    assert [(change["op"], change["name"]) for change in changes] == [
+        ("created", "alpha"),
+        ("created", "beta"),
+        ("updated", "alpha"),
+        ("deleted", "beta"),
+        ("created", "gamma"),
+        ("updated", "alpha"),
+    ]
+    assert [change["seq"] for change in changes] == sorted(
+        change["seq"] for change in changes
+    )
+    assert changes[3]["id"] == beta["id"]
+    assert changes[1]["service"] is None and changes[3]["service"] is None
+    assert changes[5]["service"]["owner_team"] == "Ops"
+
+    cursor = rest["next_cursor"]
+    started = time.monotonic()
+    idle = client.get(
+        "/api/v1/services/changes",
+        params={"since": cursor, "wait": 0.2},
+        headers=auth_headers,
+    ).json()
+    assert idle == {"changes": [], "next_cursor": cursor}
+    assert time.monotonic() - started >= 0.2
+
+    def _write_later() -> None:
+        time.sleep(0.3)
+        client.post(
+            "/api/v1/services", json=_create_payload("delta"), headers=auth_headers
+        )
+
+    writer = threading.Thread(target=_write_later)
+    writer.start()
+    started = time.monotonic()
+    polled = client.get(
+        "/api/v1/services/changes",
+        params={"since": cursor, "wait": 10},
+        headers=auth_headers,
+    ).json()
+    writer.join()
+    assert time.monotonic() - started < 5
+    assert [(change["op"], change["name"]) for change in polled["changes"]] == [
+        ("created", "delta")
+    ]
+
+
+def test_facets_count_filtered_services(
+    client: TestClient, auth_headers: dict[str, str]
+) -> None:
+    for payload in [
+        {**_create_payload("alpha"), "tags": ["pci", "edge"]},
+        {**_create_payload("beta", owner="team a"), "tags": ["pci"]},
+        {
+            **_create_payload("gamma"),
+            "owner_team": "Search",
+            "tier": "bronze",
+            "tags": [],
+        },
+    ]:
+        client.post("/api/v1/services", json=payload, headers=auth_headers)
+
+    facets = client.get("/api/v1/services/facets", headers=auth_headers).json()
+    assert [item["count"] for item in facets["owner_team"]] == [2, 1]
+    assert facets["owner_team"][0]["value"].lower() == "team a"
+    assert facets["tags"] == [
+        {"value": "pci", "count": 2},
+        {"value": "edge", "count": 1},
+    ]
+    assert {item["value"]: item["count"] for item in facets["tier"]}["bronze"] == 1
+
+    filtered = client.get(
+        "/api/v1/services/facets",
+        params={"tag": "pci", "top_tags": 1},
+        headers=auth_headers,
+    ).json()
+    assert sum(item["count"] for item in filtered["tier"]) == 2
+    assert filtered["tags"] == [{"value": "pci", "count": 2}]
+
+    # Cached facets are dropped by the next write.
+    client.post(
+        "/api/v1/services",
+        json={**_create_payload("delta"), "tags": ["pci"]},
+        headers=auth_headers,
+    )
+    refreshed = client.get(
+        "/api/v1/services/facets", params={"tag": "pci"}, headers=auth_headers
+    ).json()
+    assert sum(item["count"] for item in refreshed["lifecycle"]) == 3
+
+
+def test_find_services_by_endpoint(
+    client: TestClient, auth_headers: dict[str, str]
+) -> None:
+    for name, endpoints in [
+        ("edge", ["https://api.example.com"]),
+        ("orders", ["https://API.example.com/orders/", "http://api.example.com:8080"]),
+        ("orders-v2", ["https://api.example.com/orders/v2"]),
+        ("other", ["https://other.example.com/orders"]),
+    ]:
+        client.post(
+            "/api/v1/services",
+            json={**_create_payload(name), "endpoints": endpoints},
+            headers=auth_headers,
+        )
+
+    def owners(**params: str) -> list[tuple[str, str]]:
+        response = client.get(
+            "/api/v1/services/by-endpoint", params=params, headers=auth_headers
+        )
+        assert response.status_code == 200
+        return [
+            (item["service"]["name"], item["endpoint"])
+            for item in response.json()["items"]
+        ]
+
+    assert owners(url="https://api.example.com/orders/v2/items?x=1") == [
+        ("orders-v2", "https://api.example.com/orders/v2")
+    ]
+    assert owners(url="https://api.example.com/orders/123") == [
+        ("orders", "https://api.example.com/orders/")
+    ]
+    assert owners(url="https://api.example.com:443/ordersx") == [
+        ("edge", "https://api.example.com/")
+    ]
+    assert owners(url="http://api.example.com:8080/health") == [
+        ("orders", "http://api.example.com:8080/")
+    ]
+    assert owners(url="https://unknown.example.com/") == []
+    assert [name for name, _ in owners(host="API.example.com")] == [
+        "edge",
+        "orders",
+        "orders",
+        "orders-v2",
+    ]
+
+    other = client.get(
+        "/api/v1/services/by-endpoint",
+        params={"host": "other.example.com"},
+        headers=auth_headers,
+    ).json()["items"][0]["service"]
+    client.put(
+        f"/api/v1/services/{other['id']}",
+        json={"endpoints": ["https://moved.example.com"]},
+        headers=auth_headers,
+    )
+    assert owners(host="other.example.com") == []
+    assert owners(host="moved.example.com") == [("other", "https://moved.example.com/")]
+
+    for params in [{}, {"url": "x", "host": "y"}, {"url": "not a url"}]:
+        rejected = client.get(
+            "/api/v1/services/by-endpoint", params=params, headers=auth_headers
+        )
+        assert rejected.status_code == 400
+
+
+def test_init_db_backfills_search_text(
+    client: TestClient, auth_headers: dict[str, str]
+) -> None:
+    client.post(
+        "/api/v1/services", json=_create_payload("legacy-ledger"), headers=auth_headers
+    )
+    # A database upgraded from before search: empty column, no FTS table yet.
+    with get_session() as session:
+        session.execute(text("UPDATE service SET search_text = ''"))
+        for trigger in ("service_fts_ai", "service_fts_ad", "service_fts_au"):
+            session.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        session.execute(text("DROP TABLE IF EXISTS service_fts"))
+    init_db()
+
+    found = client.get(
+        "/api/v1/services", params={"search": "ledger"}, headers=auth_headers
+    ).json()
+    assert [item["name"] for item in found["items"]] == ["legacy-ledger"]
@@ -0,0 +1,77 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from svc_catalogue.db import get_session
+from svc_catalogue.models import ServiceTag, TagCount
+
+
+def _tags(
+    client: TestClient, headers: dict[str, str], **params: object
+) -> list[tuple[str, int]]:
+    response = client.get("/api/v1/tags", params=params, headers=headers)
+    assert response.status_code == 200
+    return [(item["tag"], item["count"]) for item in response.json()["items"]]
+
+
+def _create(client: TestClient, headers: dict[str, str], name: str, tags: list[str]):
+    response = client.post(
+        "/api/v1/services",
+        json={
+            "name": name,
+            "owner_team": "Platform",
+            "tier": "gold",
+            "lifecycle": "production",
+            "tags": tags,
+        },
+        headers=headers,
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_tag_counts_follow_every_write_path(
+    client: TestClient, auth_headers: dict[str, str]
+) -> None:
+    first = _create(client, auth_headers, "alpha", ["payments", "pci"])
+    _create(client, auth_headers, "beta", ["payments", "platform"])
+    assert _tags(client, auth_headers) == [
+        ("payments", 2),
+        ("pci", 1),
+        ("platform", 1),
+    ]
+    assert _tags(client, auth_headers, prefix="P") == _tags(client, auth_headers)
+    assert _tags(client, auth_headers, prefix="pl") == [("platform", 1)]
+    assert _tags(client, auth_headers, prefix="pay", limit=1) == [("payments", 2)]
+
+    client.put(
+        f"/api/v1/services/{first}", json={"tags": ["platform"]}, headers=auth_headers
+    )
+    assert _tags(client, auth_headers) == [("platform", 2), ("payments", 1)]
+
+    csv_data = (
+        "name,owner_team,tier,lifecycle,endpoints,tags,id\n"
+        "beta,Platform,gold,production,,platform;,\n"
+        "gamma,Platform,gold,production,,pci;pci-dss;,\n"
+    )
+    response = client.post(
+        "/api/v1/services/import",
+        files={"file": ("services.csv", csv_data, "text/csv")},
+        headers=auth_headers,
+    )
+    assert response.status_code == 202
+    assert _tags(client, auth_headers, prefix="p") == [
+        ("platform", 2),
+        ("pci", 1),
+        ("pci-dss", 1),
+    ]
+
+    client.delete(f"/api/v1/services/{first}", headers=auth_headers)
+    assert _tags(client, auth_headers, prefix="pla") == [("platform", 1)]
+
+    # The counters always agree with the assignments they summarize.
+    with get_session() as session:
+        expected = session.execute(
+            select(ServiceTag.tag, func.count()).group_by(ServiceTag.tag)
+        ).all()
+        counts = session.execute(select(TagCount.tag, TagCount.count)).all()
+    assert sorted(counts) == sorted(expected)